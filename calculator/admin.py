@@ -1,8 +1,58 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Semester, Subject,UserResult,Department
+from . import aggregates, analytics
+from .models import Semester, Subject,UserResult,Department,CGPAAggregate,OutboundEmail,ResultSummary
 
 admin.site.register(Semester)
 admin.site.register(Subject)
-admin.site.register(UserResult)
 admin.site.register(Department)
+admin.site.register(OutboundEmail)
+
+
+@admin.register(UserResult)
+class UserResultAdmin(admin.ModelAdmin):
+    """Keeps CGPAAggregate and ResultSummary in step with admin edits, as the API views do."""
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = UserResult.objects.select_for_update().filter(pk=obj.pk).first() if change else None
+            super().save_model(request, obj, form, change)
+            groups = {}
+            if previous is not None:
+                aggregates.remove_result(previous)
+                groups.setdefault((previous.department_id, previous.semester), ([], []))[0].append(
+                    (previous.cgpa, previous.arrear_count)
+                )
+            aggregates.add_result(obj)
+            groups.setdefault((obj.department_id, obj.semester), ([], []))[1].append((obj.cgpa, obj.arrear_count))
+            for (department_id, semester), (removed, added) in groups.items():
+                analytics.apply_delta(department_id, semester, removed, added)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            aggregates.remove_result(obj)
+            analytics.apply_delta(obj.department_id, obj.semester, removed=[(obj.cgpa, obj.arrear_count)])
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for obj in queryset.select_for_update():
+                self.delete_model(request, obj)
+
+
+class DerivedAdmin(admin.ModelAdmin):
+    """Read-only: these rows are derived from UserResult and rebuilt by management commands.
+
+    Delete stays allowed so that deleting a department can cascade to them.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(CGPAAggregate, DerivedAdmin)
+admin.site.register(ResultSummary, DerivedAdmin)
@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+
+from . import ranking
+from .models import CGPAAggregate, UserResult
+
+
+def _totals(queryset):
+    return queryset.aggregate(
+        credits=Coalesce(Sum("total_credits"), 0),
+        grade_points=Coalesce(Sum("total_grade_points"), 0.0),
+        rows=Count("id"),
+    )
+
+
+def _overall(grade_points, credits):
+    return grade_points / credits if credits > 0 else None
+
+
+def apply_delta(email, department_id, credits=0, grade_points=0.0, semesters=0):
+    """Shift the running totals for one (email, department).
+
+    Must run inside the same transaction as the UserResult change it mirrors.
+    """
+    # Locked so concurrent writes for the student read ``old`` one after another.
+    aggregate, _ = CGPAAggregate.objects.select_for_update().get_or_create(email=email, department_id=department_id)
+    CGPAAggregate.objects.filter(pk=aggregate.pk).update(
+        total_credits=F("total_credits") + credits,
+        total_grade_points=F("total_grade_points") + grade_points,
+        semester_count=F("semester_count") + semesters,
+        version=F("version") + 1,
+    )
+    if department_id is not None:
+        old = _overall(aggregate.total_grade_points, aggregate.total_credits)
+        new = _overall(aggregate.total_grade_points + grade_points, aggregate.total_credits + credits)
+        transaction.on_commit(lambda: ranking.record_change(int(department_id), old, new))
+
+
+def add_result(result):
+    apply_delta(result.email, result.department_id, result.total_credits, result.total_grade_points, 1)
+
+
+def remove_result(result):
+    apply_delta(result.email, result.department_id, -result.total_credits, -result.total_grade_points, -1)
+
+
+def delete_results(email, department_id, **filters):
+    """Delete the matching UserResult rows and subtract them from the aggregate."""
+    queryset = UserResult.objects.filter(email=email, department=department_id, **filters)
+    totals = _totals(queryset)
+    deleted, _ = queryset.delete()
+    if totals["rows"]:
+        apply_delta(email, department_id, -totals["credits"], -totals["grade_points"], -totals["rows"])
+    return deleted
+
+
+def refresh(keys):
+    """Recompute the aggregates for a set of (email, department_id) keys from UserResult.
+
+    Used after bulk writes, where per-row deltas would cost a query per row.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    totals = {
+        (row["email"], row["department"]): row
+        for row in UserResult.objects.filter(email__in={email for email, _ in keys})
+        .values("email", "department")
+        .annotate(credits=Sum("total_credits"), grade_points=Sum("total_grade_points"), rows=Count("id"))
+        .order_by()
+    }
+
+    upserts = []
+    for email, department_id in keys:
+        row = totals.get((email, department_id), {"credits": 0, "grade_points": 0.0, "rows": 0})
+        values = {
+            "total_credits": row["credits"] or 0,
+            "total_grade_points": row["grade_points"] or 0.0,
+            "semester_count": row["rows"],
+        }
+        if department_id is None:
+            # NULL never conflicts on the unique constraint, so upsert it by hand.
+            CGPAAggregate.objects.update_or_create(email=email, department=None, defaults=values)
+        else:
+            upserts.append(CGPAAggregate(email=email, department_id=department_id, **values))
+
+    CGPAAggregate.objects.bulk_create(
+        upserts,
+        update_conflicts=True,
+        unique_fields=["email", "department"],
+        update_fields=["total_credits", "total_grade_points", "semester_count", "updated_at"],
+    )
+    # The upsert can only copy values in, so bump the history versions separately
+    # (for all of these students' departments: at worst a spare revalidation).
+    CGPAAggregate.objects.filter(email__in={email for email, _ in keys}).update(version=F("version") + 1)
+    for department_id in {department_id for _, department_id in keys if department_id is not None}:
+        transaction.on_commit(lambda department_id=department_id: ranking.invalidate(department_id))
+
+
+def expected_aggregates():
+    """Recompute every aggregate from UserResult, keyed by (email, department_id)."""
+    rows = (
+        UserResult.objects.values("email", "department")
+        .annotate(credits=Sum("total_credits"), grade_points=Sum("total_grade_points"), rows=Count("id"))
+        .order_by()
+    )
+    return {
+        (row["email"], row["department"]): (row["credits"] or 0, row["grade_points"] or 0.0, row["rows"])
+        for row in rows
+    }
@@ -0,0 +1,230 @@
+"""Precomputed CGPA distribution summaries per (department, semester).
+
+A save or delete shifts its group's counts, CGPA sum, mean, histogram and
+(when it widens the range) min/max in place with ``apply_delta``, in the
+same transaction, so a write costs one summary row regardless of cohort
+size. Median and percentiles cannot be shifted that way: the delta marks
+the summary stale, and ``refresh_stale`` recomputes stale groups from
+UserResult off the request path, either in a debounced daemon thread in
+the web process (``RESULT_SUMMARIES["INLINE_WORKER"]``) or through
+``rebuild_result_summaries --stale``. Bulk imports only mark their groups
+stale. ``rebuild_all`` recomputes every group in one ordered pass over
+UserResult.
+"""
+import logging
+import threading
+import time
+from itertools import groupby
+
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import ResultSummary, UserResult
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (10, 25, 75, 90)
+HISTOGRAM_EDGES = np.linspace(0, 10, 11)
+
+DEFAULTS = {
+    "INLINE_WORKER": False,
+    "REFRESH_DELAY_SECONDS": 5,
+}
+
+
+def summary_setting(name):
+    return getattr(settings, "RESULT_SUMMARIES", {}).get(name, DEFAULTS[name])
+
+
+def summarize(cgpas, arrears):
+    """Distribution stats for one group, as ResultSummary field values; NULL CGPAs count only towards pass rates."""
+    cgpas = np.asarray([c for c in cgpas if c is not None], dtype=np.float64)
+    arrears = np.asarray(arrears, dtype=np.int64)
+    values = {
+        "count": int(arrears.size),
+        "pass_count": int(np.count_nonzero(arrears == 0)),
+        "cgpa_sum": float(cgpas.sum()),
+        "stale": False,
+        "mean": None,
+        "median": None,
+        "minimum": None,
+        "maximum": None,
+        "percentiles": {},
+        "histogram": [0] * (len(HISTOGRAM_EDGES) - 1),
+    }
+    if cgpas.size:
+        points = np.percentile(cgpas, PERCENTILES)
+        values.update(
+            mean=round(float(cgpas.mean()), 4),
+            median=round(float(np.median(cgpas)), 4),
+            minimum=float(cgpas.min()),
+            maximum=float(cgpas.max()),
+            percentiles={f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, points)},
+            histogram=np.histogram(np.clip(cgpas, 0, 10), bins=HISTOGRAM_EDGES)[0].tolist(),
+        )
+    return values
+
+
+def _group(department_id, semester):
+    return (int(department_id) if department_id is not None else None, int(semester))
+
+
+def _bucket(cgpa):
+    # np.histogram's bins: half-open, except the last, which includes 10.
+    index = int(np.searchsorted(HISTOGRAM_EDGES, min(max(cgpa, 0.0), 10.0), side="right")) - 1
+    return min(index, len(HISTOGRAM_EDGES) - 2)
+
+
+def result_values(email, department_id, semester):
+    """(cgpa, arrear_count) of the student's results in one group, read before they are replaced or deleted."""
+    return list(
+        UserResult.objects.filter(email=email, department=department_id, semester=semester)
+        .values_list("cgpa", "arrear_count")
+    )
+
+
+def apply_delta(department_id, semester, removed=(), added=()):
+    """Shift one group's summary by the (cgpa, arrear_count) results removed and added.
+
+    Must run inside the same transaction as, and after, the UserResult
+    change it mirrors. Marks the summary stale for ``refresh_stale``.
+    """
+    removed, added = list(removed), list(added)
+    if not removed and not added:
+        return
+    department_id, semester = _group(department_id, semester)
+    summary, created = ResultSummary.objects.select_for_update().get_or_create(
+        department_id=department_id, semester=semester
+    )
+    if created:
+        # No summary to shift (never built, or emptied): a delta from zero
+        # would only cover this write, so build it from the group's results.
+        refresh_group(department_id, semester)
+        return
+    histogram = list(summary.histogram) or [0] * (len(HISTOGRAM_EDGES) - 1)
+    for sign, rows in ((-1, removed), (1, added)):
+        for cgpa, arrear_count in rows:
+            summary.count += sign
+            summary.pass_count += sign * (arrear_count == 0)
+            if cgpa is not None:
+                summary.cgpa_sum += sign * float(cgpa)
+                histogram[_bucket(float(cgpa))] += sign
+    if summary.count <= 0:
+        summary.delete()
+        return
+
+    cgpa_count = sum(histogram)
+    summary.histogram = histogram
+    summary.mean = round(summary.cgpa_sum / cgpa_count, 4) if cgpa_count else None
+    # Adding a result can only widen the range; a removed extreme is left
+    # for the refresh to correct.
+    added_cgpas = [float(cgpa) for cgpa, _ in added if cgpa is not None]
+    if added_cgpas and cgpa_count:
+        summary.minimum = min([summary.minimum, *added_cgpas] if summary.minimum is not None else added_cgpas)
+        summary.maximum = max([summary.maximum, *added_cgpas] if summary.maximum is not None else added_cgpas)
+    elif not cgpa_count:
+        summary.mean = summary.median = summary.minimum = summary.maximum = None
+        summary.percentiles = {}
+    summary.stale = True
+    summary.save()
+    if summary_setting("INLINE_WORKER"):
+        transaction.on_commit(wake_refresher)
+
+
+def mark_stale(groups):
+    """Queue a full recompute of (department_id, semester) groups, e.g. after a bulk write."""
+    groups = {_group(d, s) for d, s in groups}
+    for department_id, semester in groups:
+        ResultSummary.objects.update_or_create(department_id=department_id, semester=semester,
+                                               defaults={"stale": True})
+    if groups and summary_setting("INLINE_WORKER"):
+        transaction.on_commit(wake_refresher)
+
+
+def refresh_group(department_id, semester):
+    """Recompute one group's summary from UserResult."""
+    with transaction.atomic():
+        # Lock the summary first so no delta lands between the read and the write.
+        list(ResultSummary.objects.select_for_update().filter(department=department_id, semester=semester))
+        rows = UserResult.objects.filter(department=department_id, semester=semester).values_list("cgpa", "arrear_count")
+        cgpas, arrears = zip(*rows) if rows else ((), ())
+        if not arrears:
+            ResultSummary.objects.filter(department=department_id, semester=semester).delete()
+            return
+        ResultSummary.objects.update_or_create(
+            department_id=department_id, semester=semester, defaults=summarize(cgpas, arrears)
+        )
+
+
+def refresh_stale():
+    """Recompute every summary marked stale; returns how many."""
+    groups = list(ResultSummary.objects.filter(stale=True).values_list("department_id", "semester"))
+    for department_id, semester in groups:
+        refresh_group(department_id, semester)
+    return len(groups)
+
+
+def rebuild_all():
+    """Recompute every summary from UserResult; returns the number of groups."""
+    rows = (
+        UserResult.objects.order_by("department_id", "semester")
+        .values_list("department_id", "semester", "cgpa", "arrear_count")
+        .iterator(chunk_size=5000)
+    )
+    summaries = []
+    for (department_id, semester), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        _, _, cgpas, arrears = zip(*group)
+        summaries.append(ResultSummary(department_id=department_id, semester=semester, **summarize(cgpas, arrears)))
+
+    with transaction.atomic():
+        ResultSummary.objects.all().delete()
+        ResultSummary.objects.bulk_create(summaries, batch_size=500)
+    return len(summaries)
+
+
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _run_worker():
+    while True:
+        _wakeup.wait()
+        # Let a burst of writes land first, so each group is recomputed once.
+        time.sleep(summary_setting("REFRESH_DELAY_SECONDS"))
+        _wakeup.clear()
+        try:
+            refresh_stale()
+        except Exception:
+            logger.exception("Result summary refresh failed")
+        finally:
+            close_old_connections()
+
+
+def wake_refresher():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name="result-summaries", daemon=True)
+            _worker.start()
+    _wakeup.set()
+
+
+def as_dict(summary):
+    return {
+        "department": summary.department_id,
+        "semester": summary.semester,
+        "count": summary.count,
+        "mean": summary.mean,
+        "median": summary.median,
+        "min": summary.minimum,
+        "max": summary.maximum,
+        "percentiles": summary.percentiles,
+        "histogram": {"edges": HISTOGRAM_EDGES.tolist(), "counts": summary.histogram},
+        "pass_ratio": round(summary.pass_count / summary.count, 4) if summary.count else None,
+        "arrear_ratio": round(1 - summary.pass_count / summary.count, 4) if summary.count else None,
+        # Median, percentiles and a removed min/max lag until the group is refreshed.
+        "stale": summary.stale,
+        "updated_at": summary.updated_at,
+    }
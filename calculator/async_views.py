@@ -0,0 +1,166 @@
+"""Native async versions of the read-heavy endpoints, for ASGI deployments.
+
+These are plain Django async views (DRF's ``@api_view`` is sync-only) that
+return the same payloads and status codes as their counterparts in
+``views.py``, using the async cache API and async ORM (``aget``,
+``afirst``, ``async for``). calculator/urls.py routes to them when
+``settings.ASYNC_VIEWS`` is on, which ``cgpa_calculator/asgi.py`` enables.
+"""
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from . import catalog, etags, otp_store, throttling, views
+from .models import CGPAAggregate, Department, Semester, UserResult
+from .pagination import DynamicPageNumberPagination
+from .serializers import USER_RESULT_VALUES
+
+
+def _error(message, status, key="error"):
+    return JsonResponse({key: message}, status=status)
+
+
+def _throttled(wait):
+    """The 429 DRF's ``Throttled`` exception produces."""
+    wait = math.ceil(wait)
+    response = _error(f"Request was throttled. Expected available in {wait} second{'s' if wait != 1 else ''}.", 429, key="detail")
+    response["Retry-After"] = str(wait)
+    return response
+
+
+@require_GET
+@etags.acondition(etags.acatalog_etag)
+async def list_departments(request):
+    return JsonResponse({"departments": await catalog.adepartments()})
+
+
+@require_GET
+@etags.acondition(etags.acatalog_etag)
+async def list_semesters(request):
+    return JsonResponse({"semesters": await catalog.asemesters()})
+
+
+@require_GET
+@etags.acondition(etags.acatalog_etag)
+async def subjects_by_semester_and_department(request, sem_num, dept_code):
+    try:
+        return JsonResponse({"subjects": await catalog.asubjects(sem_num, dept_code)})
+    except Semester.DoesNotExist:
+        return _error("Semester not found", 404)
+    except Department.DoesNotExist:
+        return _error("Department not found", 404)
+
+
+def _page_size(request):
+    size = request.GET.get(DynamicPageNumberPagination.page_size_query_param)
+    try:
+        return max(1, min(int(size), DynamicPageNumberPagination.max_page_size))
+    except (TypeError, ValueError):
+        return DynamicPageNumberPagination.page_size
+
+
+@require_GET
+@etags.acondition(etags.ahistory_etag)
+async def user_historys(request):
+    email = request.GET.get("email")
+    department = request.GET.get("dept_id")
+    if not email:
+        return _error("email required", 401)
+    if request.GET.get("pagination") == "cursor":
+        # Keyset pages are already cheap; reuse the DRF implementation.
+        return await sync_to_async(views.user_historys)(request)
+    try:
+        department = await Department.objects.aget(id=department)
+    except Department.DoesNotExist:
+        return _error("Invalid department ID", 404)
+
+    results = USER_RESULT_VALUES.values(
+        UserResult.objects.filter(email=email, department=department).order_by("created_at")
+    )
+    size = _page_size(request)
+    count = await results.acount()
+    try:
+        page = Paginator(range(count), size).validate_number(request.GET.get("page", 1))
+    except (EmptyPage, PageNotAnInteger):
+        return _error("Invalid page.", 404, key="detail")
+
+    rows = [row async for row in results[(page - 1) * size:page * size]]
+    return JsonResponse({"history": USER_RESULT_VALUES.serialize(rows)})
+
+
+@require_GET
+async def calculate_overall_cgpa(request):
+    email = request.GET.get("email")
+    department = request.GET.get("dept_id")
+    aggregate = await CGPAAggregate.objects.filter(email=email, department=department).afirst()
+
+    if aggregate is None or aggregate.total_credits == 0:
+        return _error("No credits found.", 400)
+
+    return JsonResponse({"cgpa": aggregate.cgpa, "semester_count": aggregate.semester_count})
+
+
+FORM_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+
+def _request_data(request):
+    """(data, None) or (None, error response), parsed the way DRF's default parsers would."""
+    if not request.body:
+        return {}, None
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body)
+        except ValueError as e:
+            return None, _error(f"JSON parse error - {e}", 400, key="detail")
+    elif request.content_type in FORM_TYPES:
+        data = request.POST
+    else:
+        return None, _error(f'Unsupported media type "{request.META.get("CONTENT_TYPE", "")}" in request.', 415, key="detail")
+    return (data if isinstance(data, dict) else {}), None
+
+
+@csrf_exempt
+@require_POST
+async def send_otp(request):
+    data, error = _request_data(request)
+    if error is not None:
+        return error
+    wait = await throttling.acheck(throttling.SEND_OTP_THROTTLES, request, data)
+    if wait is not None:
+        return _throttled(wait)
+    email = data.get("email")
+    if not email:
+        return _error("Email is required", 400)
+
+    # One short transaction; the email itself is sent by the queue worker.
+    await sync_to_async(otp_store.issue_and_send)(email)
+    return JsonResponse({"message": "OTP sent"})
+
+
+@csrf_exempt
+@require_POST
+async def verify_otp(request):
+    data, error = _request_data(request)
+    if error is not None:
+        return error
+    wait = await throttling.acheck(throttling.VERIFY_OTP_THROTTLES, request, data)
+    if wait is not None:
+        return _throttled(wait)
+    email = data.get("email")
+    otp = data.get("otp")
+
+    if not email or not otp:
+        return JsonResponse({"verified": False, "error": "Email and OTP are required"}, status=400)
+
+    outcome = await otp_store.averify(email, otp)
+    if outcome == otp_store.VERIFIED:
+        return JsonResponse({"verified": True})
+    elif outcome == otp_store.EXPIRED:
+        return JsonResponse({"verified": False, "error": "OTP expired"}, status=400)
+    else:
+        return JsonResponse({"verified": False, "error": "Invalid OTP"}, status=400)
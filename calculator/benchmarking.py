@@ -0,0 +1,222 @@
+"""Timing helpers and the endpoint catalogue shared by the ``bench_*`` management commands."""
+import time
+from contextlib import nullcontext
+
+import numpy as np
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import override_settings
+
+from .metrics import QueryCounter, counting
+from .models import CGPAAggregate, Subject
+from .seeding import BENCH_EMAIL_DOMAIN
+
+PERCENTILES = (50, 95, 99)
+
+
+class Timer:
+    """Collects per-request latencies (seconds) and the wall-clock span of a run."""
+
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self.started = self.finished = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.finished = time.perf_counter()
+
+    def record(self, seconds, ok=True):
+        self.samples.append(seconds)
+        self.errors += not ok
+
+
+def summarize(timer):
+    """Latency percentiles in milliseconds plus throughput for one run."""
+    samples = np.asarray(timer.samples, dtype=np.float64) * 1000
+    elapsed = timer.finished - timer.started
+    stats = {"requests": int(samples.size), "errors": timer.errors, "elapsed_s": round(elapsed, 3)}
+    stats["rps"] = round(samples.size / elapsed, 1) if elapsed else None
+    if samples.size:
+        for p, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+            stats[f"p{p}_ms"] = round(float(value), 2)
+    return stats
+
+
+def format_row(label, stats):
+    latencies = "  ".join(f"p{p}={stats.get(f'p{p}_ms', '-')}ms" for p in PERCENTILES)
+    queries = f"  {stats['queries']} queries/{stats['db_ms']}ms db" if "queries" in stats else ""
+    errors = f"  ({stats['errors']} errors)" if stats["errors"] else ""
+    return f"{label:<28} {stats['requests']:>6} req  {stats['rps'] or 0:>8} req/s  {latencies}{queries}{errors}"
+
+
+def test_client_settings(**overrides):
+    """Settings for driving the project in-process with Django's test clients.
+
+    The OTP throttles still check their buckets, at rates no run can exhaust.
+    """
+    rates = {scope: "1000000/second" for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]}
+    overrides.setdefault("REST_FRAMEWORK", {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates})
+    return override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], **overrides)
+
+
+class Endpoint:
+    """One benchmarked request against a route in calculator/urls.py.
+
+    ``build`` turns the fixture (see ``bench_fixture``) into keyword
+    arguments for ``Client.generic``-style calls. Mutating requests are
+    rolled back to a savepoint after each call so every iteration sees the
+    same data. A response counts as an error unless it is 2xx/3xx or
+    ``expected_status``.
+    """
+
+    def __init__(self, label, route, method, build, mutating=False, admin=False, expected_status=None):
+        self.label = label
+        self.route = route
+        self.method = method
+        self.build = build
+        self.mutating = mutating
+        self.admin = admin
+        self.expected_status = expected_status
+
+
+def _import_file(fixture):
+    rows = "".join(
+        f"{email},{fixture['department_code']},1,8.0,20,160\n" for email in fixture["emails"]
+    )
+    upload = SimpleUploadedFile("results.csv", f"email,department,semester,cgpa,total_credits,total_grade_points\n{rows}".encode())
+    return {"path": "/api/admin/import-results/", "data": {"file": upload}}
+
+
+ENDPOINTS = [
+    Endpoint("departments", "departments/", "get", lambda f: {"path": "/api/departments/"}),
+    Endpoint("semesters", "semesters/", "get", lambda f: {"path": "/api/semesters/"}),
+    Endpoint("subjects", "subjects/<int:sem_num>/<str:dept_code>/", "get",
+             lambda f: {"path": f"/api/subjects/1/{f['department_code']}/"}),
+    Endpoint("curriculum", "curriculum/<str:dept_code>/", "get",
+             lambda f: {"path": f"/api/curriculum/{f['department_code']}/"}),
+    Endpoint("send-otp", "send-otp/", "post",
+             lambda f: {"path": "/api/send-otp/", "data": {"email": f["email"]}}, mutating=True),
+    Endpoint("verify-otp", "verify-otp/", "post",
+             lambda f: {"path": "/api/verify-otp/", "data": {"email": f["email"], "otp": "000000"}},
+             mutating=True, expected_status=400),
+    Endpoint("compute-gpa", "compute-gpa/", "post",
+             lambda f: {"path": "/api/compute-gpa/", "data": {
+                 "department": f["department_id"], "semester": 1, "subjects": f["grades"]}}),
+    Endpoint("compute-gpa batch", "compute-gpa/", "post",
+             lambda f: {"path": "/api/compute-gpa/", "data": {
+                 "department": f["department_id"], "semester": 1,
+                 "students": [{"email": email, "subjects": f["grades"]} for email in f["emails"]]}}),
+    Endpoint("save-result", "save-result/", "post",
+             lambda f: {"path": "/api/save-result/", "data": {
+                 "email": f["email"], "department": f["department_id"], "semester": 1, "subjects": f["grades"]}},
+             mutating=True),
+    Endpoint("user-history", "user-history/", "get",
+             lambda f: {"path": "/api/user-history/", "data": {"email": f["email"], "dept_id": f["department_id"]}}),
+    Endpoint("user-history cursor", "user-history/", "get",
+             lambda f: {"path": "/api/user-history/", "data": {
+                 "email": f["email"], "dept_id": f["department_id"], "pagination": "cursor"}}),
+    Endpoint("admin-results", "admin-results/", "get", lambda f: {"path": "/api/admin-results/", "data": {"page": 2}}),
+    Endpoint("admin-results cursor", "admin-results/", "get",
+             lambda f: {"path": "/api/admin-results/", "data": {"pagination": "cursor", "count": "estimate"}}),
+    Endpoint("admin import", "admin/import-results/", "post", _import_file, mutating=True, admin=True),
+    Endpoint("admin export", "admin/export-results/", "get",
+             lambda f: {"path": "/api/admin/export-results/", "data": {
+                 "department": f["department_code"], "semester": 1}}, admin=True),
+    Endpoint("calculate-cgpa", "calculate-cgpa/", "get",
+             lambda f: {"path": "/api/calculate-cgpa/", "data": {"email": f["email"], "dept_id": f["department_id"]}}),
+    Endpoint("cgpa-rank", "cgpa-rank/", "get",
+             lambda f: {"path": "/api/cgpa-rank/", "data": {"email": f["email"], "dept_id": f["department_id"]}}),
+    Endpoint("analytics", "analytics/summary/", "get",
+             lambda f: {"path": "/api/analytics/summary/", "data": {"dept_id": f["department_id"]}}),
+    Endpoint("delete-result", "delete-result/", "delete",
+             lambda f: {"path": f"/api/delete-result/?email={f['email']}&semester=1&department={f['department_id']}"},
+             mutating=True),
+]
+
+
+def uncovered_routes(urlpatterns):
+    covered = {endpoint.route for endpoint in ENDPOINTS}
+    return [str(pattern.pattern) for pattern in urlpatterns if str(pattern.pattern) not in covered]
+
+
+def bench_fixture():
+    """Request inputs taken from the busiest seeded student, or None without seeded data."""
+    student = (
+        CGPAAggregate.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}", department__isnull=False)
+        .select_related("department")
+        .order_by("-semester_count", "email")
+        .first()
+    )
+    if student is None:
+        return None
+    codes = Subject.objects.filter(department=student.department, semester__number=1).values_list("code", flat=True)
+    peers = CGPAAggregate.objects.filter(department=student.department).order_by("email").values_list("email", flat=True)
+    return {
+        "email": student.email,
+        "emails": list(peers[:50]),
+        "department_id": student.department_id,
+        "department_code": student.department.code,
+        "grades": [{"code": code, "status": "PASS", "grade": "A"} for code in codes],
+    }
+
+
+def _call(client, endpoint, kwargs):
+    kwargs = dict(kwargs)
+    path = kwargs.pop("path")
+    if endpoint.method == "post" and "file" not in kwargs.get("data", {}):
+        kwargs["content_type"] = "application/json"
+    response = getattr(client, endpoint.method)(path, **kwargs)
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def _timed_call(client, endpoint, fixture, counter=None):
+    kwargs = endpoint.build(fixture)
+    with transaction.atomic() if endpoint.mutating else nullcontext():
+        with counting(counter) if counter else nullcontext():
+            with Timer() as one:
+                response = _call(client, endpoint, kwargs)
+        if endpoint.mutating:
+            transaction.set_rollback(True)
+    ok = response.status_code < 400 or response.status_code == endpoint.expected_status
+    return one.finished - one.started, ok
+
+
+def run_endpoint(client, endpoint, fixture, requests, warmup=3):
+    """Time ``requests`` sequential calls; stats include SQL queries and DB time per request."""
+    for _ in range(warmup):
+        _timed_call(client, endpoint, fixture)
+    counter = QueryCounter()
+    with Timer() as timer:
+        for _ in range(requests):
+            timer.record(*_timed_call(client, endpoint, fixture, counter))
+    stats = summarize(timer)
+    stats["queries"] = round(counter.queries / requests, 2)
+    stats["db_ms"] = round(counter.seconds * 1000 / requests, 2)
+    return stats
+
+
+def compare(baseline, current, tolerance=0.25, min_delta_ms=1.0):
+    """Regressions of ``current`` against ``baseline`` (both {label: stats}) as human-readable lines.
+
+    A route regresses when its p95 grows by more than ``tolerance`` (and by
+    at least ``min_delta_ms``, to ignore noise on sub-millisecond routes) or
+    when it issues more SQL queries per request.
+    """
+    regressions = []
+    for label, stats in current.items():
+        before = baseline.get(label)
+        if not before:
+            continue
+        old, new = before.get("p95_ms"), stats.get("p95_ms")
+        if old is not None and new is not None and new > old * (1 + tolerance) and new - old >= min_delta_ms:
+            regressions.append(f"{label}: p95 {old}ms -> {new}ms")
+        if stats.get("queries", 0) > before.get("queries", 0):
+            regressions.append(f"{label}: {before.get('queries')} -> {stats['queries']} queries per request")
+    return regressions
@@ -0,0 +1,155 @@
+"""Cached reads of the department/semester/subject catalog.
+
+Cache keys embed a catalog version token; bumping the token (see
+``invalidate_catalog``) orphans every cached entry at once, so no key
+enumeration is needed when an admin edits the catalog.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Prefetch
+
+from .db_router import use_primary
+from .models import Department, Semester, Subject
+from .serializers import DEPARTMENT_VALUES, SUBJECT_VALUES
+
+VERSION_KEY = "catalog:version"
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def catalog_version():
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_catalog():
+    _cache().set(VERSION_KEY, _new_version(), timeout=None)
+
+
+def _cached(name, build):
+    cache = _cache()
+    key = f"catalog:{catalog_version()}:{name}"
+    value = cache.get(key)
+    if value is None:
+        # Filled from the primary: a lagging replica would stay cached for the timeout.
+        with use_primary():
+            value = build()
+        cache.set(key, value, settings.CATALOG_CACHE_TIMEOUT)
+    return value
+
+
+async def acatalog_version():
+    cache = _cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, _new_version(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+async def _acached(name, build):
+    """Async twin of ``_cached``; shares its keys, so both paths hit the same entries."""
+    cache = _cache()
+    key = f"catalog:{await acatalog_version()}:{name}"
+    value = await cache.aget(key)
+    if value is None:
+        with use_primary():
+            value = await build()
+        await cache.aset(key, value, settings.CATALOG_CACHE_TIMEOUT)
+    return value
+
+
+def departments():
+    return _cached(
+        "departments",
+        lambda: DEPARTMENT_VALUES.serialize(DEPARTMENT_VALUES.values(Department.objects.order_by("id"))),
+    )
+
+
+def semesters():
+    return _cached(
+        "semesters",
+        lambda: list(Semester.objects.order_by("number").values_list("number", flat=True)),
+    )
+
+
+def subjects(sem_num, dept_code):
+    """Subjects for one semester and department.
+
+    Raises Semester.DoesNotExist / Department.DoesNotExist, which are not cached.
+    """
+    def build():
+        semester = Semester.objects.get(number=sem_num)
+        department = Department.objects.get(code=dept_code)
+        queryset = Subject.objects.filter(semester=semester, department=department).order_by("id")
+        return SUBJECT_VALUES.serialize(SUBJECT_VALUES.values(queryset))
+
+    return _cached(f"subjects:{sem_num}:{dept_code}", build)
+
+
+def curriculum(dept_code):
+    """Every semester with this department's subjects, in one payload.
+
+    Raises Department.DoesNotExist, which is not cached.
+    """
+    def build():
+        department = Department.objects.get(code=dept_code)
+        department_subjects = Subject.objects.filter(department=department).only(
+            "code", "name", "credit", "semester_id"
+        ).order_by("id")
+        semesters = Semester.objects.order_by("number").prefetch_related(
+            Prefetch("subjects", queryset=department_subjects, to_attr="department_subjects")
+        )
+        return {
+            "department": {"id": department.id, "name": department.name, "code": department.code},
+            "semesters": [
+                {
+                    "number": semester.number,
+                    "subjects": [
+                        {"code": subject.code, "name": subject.name, "credit": subject.credit}
+                        for subject in semester.department_subjects
+                    ],
+                }
+                for semester in semesters
+            ],
+        }
+
+    return _cached(f"curriculum:{dept_code}", build)
+
+
+# Async variants for the ASGI read path, using the async ORM.
+
+async def adepartments():
+    async def build():
+        return DEPARTMENT_VALUES.serialize([row async for row in DEPARTMENT_VALUES.values(Department.objects.order_by("id"))])
+
+    return await _acached("departments", build)
+
+
+async def asemesters():
+    async def build():
+        return [number async for number in Semester.objects.order_by("number").values_list("number", flat=True)]
+
+    return await _acached("semesters", build)
+
+
+async def asubjects(sem_num, dept_code):
+    async def build():
+        semester = await Semester.objects.aget(number=sem_num)
+        department = await Department.objects.aget(code=dept_code)
+        queryset = Subject.objects.filter(semester=semester, department=department).order_by("id")
+        return SUBJECT_VALUES.serialize([row async for row in SUBJECT_VALUES.values(queryset)])
+
+    return await _acached(f"subjects:{sem_num}:{dept_code}", build)
@@ -0,0 +1,50 @@
+"""Response compression: brotli when the client and server support it, else gzip.
+
+``CompressionMiddleware`` extends Django's ``GZipMiddleware`` with a size
+threshold (``COMPRESSION_MIN_BYTES``; below it the framing overhead and CPU
+are not worth it) and brotli for buffered responses when the optional
+``brotli`` package is installed. Streaming responses, such as the result
+export, are gzipped chunk by chunk as before.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_bytes = getattr(settings, "COMPRESSION_MIN_BYTES", 1024)
+        self.brotli_quality = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_bytes:
+            return response
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not re_accepts_brotli.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        # As for gzip: the body changed, so a strong ETag no longer holds.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = "br"
+        return response
@@ -0,0 +1,117 @@
+"""Send catalog and history reads to a read replica, everything else to the primary.
+
+The replica is the ``replica`` database alias (see ``CGPA_REPLICA`` in
+settings); without it every query uses ``default``. Reads fall back to the
+primary whenever they could observe a lagging replica:
+
+* inside a transaction on the primary,
+* after this request (or management command) has written anything,
+* for a client holding the ``ReplicaStickinessMiddleware`` cookie, which is
+  set for ``REPLICA_STICKY_SECONDS`` after each successful write request,
+* inside ``use_primary()``, e.g. while filling a shared cache.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = "replica"
+STICKY_COOKIE = "cgpa_primary"
+
+# Models whose reads tolerate replication lag.
+REPLICA_MODELS = {"department", "semester", "subject", "userresult", "cgpaaggregate", "resultsummary"}
+
+_pinned = ContextVar("cgpa_pinned_to_primary", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def pin_to_primary():
+    _pinned.set(True)
+
+
+@contextmanager
+def use_primary():
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            not replica_configured()
+            or model._meta.app_label != "calculator"
+            or model._meta.model_name not in REPLICA_MODELS
+            or _pinned.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary (sync_replica or database
+        # replication), never migrated on its own.
+        return db == DEFAULT_DB_ALIAS
+
+
+def _sticky_seconds():
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+
+
+class ReplicaStickinessMiddleware:
+    """Read-your-writes across requests: pin a client to the primary briefly after it writes."""
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _pinned.set(self.is_sticky(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = _pinned.set(self.is_sticky(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        return self.process_response(request, response)
+
+    def is_sticky(self, request):
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def process_response(self, request, response):
+        if request.method not in self.SAFE_METHODS and response.status_code < 400 and replica_configured():
+            seconds = _sticky_seconds()
+            response.set_cookie(STICKY_COOKIE, f"{time.time() + seconds:.0f}", max_age=seconds, httponly=True, samesite="Lax")
+        return response
@@ -0,0 +1,116 @@
+"""Version-based ETags for the catalog and result-history endpoints.
+
+Catalog responses are tagged with the catalog version token (see
+``catalog.invalidate_catalog``), which changes whenever a department,
+semester or subject is saved or deleted. A student's history is tagged with
+the primary key and ``version`` of their ``CGPAAggregate`` row, which is
+bumped in the same transaction as every change to their results; the key
+keeps a recreated aggregate from reusing an old tag. Computing either tag
+takes only cache reads or one index lookup, so a matching ``If-None-Match`` is answered
+with 304 before the view queries or serializes anything.
+
+Views are wrapped with ``condition`` (sync) or ``acondition`` (async),
+which work like Django's ``condition`` decorator but tag only 200
+responses. The catalog tag is withheld for subjects and curriculum URLs
+naming an unknown semester or department, so a 404 is never answered
+with 304.
+"""
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, quote_etag
+
+from . import catalog
+from .models import CGPAAggregate
+
+
+def _department_codes(departments):
+    return {department["code"] for department in departments}
+
+
+# A subjects or curriculum URL naming an unknown semester or department
+# answers 404; it is left untagged so the miss is never revalidated.
+
+def catalog_etag(request, *args, sem_num=None, dept_code=None, **kwargs):
+    version = catalog.catalog_version()
+    if dept_code is not None and dept_code not in _department_codes(catalog.departments()):
+        return None
+    if sem_num is not None and sem_num not in catalog.semesters():
+        return None
+    return f'"catalog-{version}"'
+
+
+async def acatalog_etag(request, *args, sem_num=None, dept_code=None, **kwargs):
+    version = await catalog.acatalog_version()
+    if dept_code is not None and dept_code not in _department_codes(await catalog.adepartments()):
+        return None
+    if sem_num is not None and sem_num not in await catalog.asemesters():
+        return None
+    return f'"catalog-{version}"'
+
+
+def _history_key(request):
+    email = request.GET.get("email")
+    department = request.GET.get("dept_id")
+    if not email or not department or not department.isdigit():
+        return None
+    return CGPAAggregate.objects.filter(email=email, department_id=int(department)).values_list("pk", "version")
+
+
+def _history_tag(row):
+    # No aggregate: an unknown department or a student with no results yet;
+    # leave those responses untagged.
+    return None if row is None else f'"history-{row[0]}-{row[1]}"'
+
+
+def history_etag(request, *args, **kwargs):
+    rows = _history_key(request)
+    return None if rows is None else _history_tag(rows.first())
+
+
+async def ahistory_etag(request, *args, **kwargs):
+    rows = _history_key(request)
+    return None if rows is None else _history_tag(await rows.afirst())
+
+
+def _tag(request, response, etag):
+    # Only successful responses are tagged: a tagged error could be
+    # revalidated as 304 and kept by the client.
+    if etag and request.method in ("GET", "HEAD") and response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+    return response
+
+
+def condition(etag_func):
+    """``django.views.decorators.http.condition(etag_func=...)``, tagging only 200 responses."""
+
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            etag = etag_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _tag(request, response, etag)
+
+        return inner
+
+    return decorator
+
+
+def acondition(etag_func):
+    """Async counterpart of ``condition``, for async views and async ``etag_func``."""
+
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            return _tag(request, response, etag)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,86 @@
+"""Streaming export of UserResult rows as CSV or NDJSON.
+
+Rows come from ``values_list(...).iterator(chunk_size=...)``, so no model
+instances are built and memory stays constant; output is yielded one
+chunk of rows at a time so the first bytes go out immediately.
+
+Under ASGI, Django collects a sync iterator into a list before sending
+it, so ``aexport_results`` wraps the same generator in an async one that
+pulls each chunk through ``sync_to_async``.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+
+from .models import UserResult
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# The same columns import_results accepts, plus created_at.
+COLUMNS = ("email", "department", "semester", "cgpa", "total_credits", "total_grade_points", "arrear_count", "created_at")
+_QUERY_COLUMNS = (
+    "email", "department__code", "semester", "cgpa", "total_credits", "total_grade_points", "arrear_count", "created_at",
+)
+
+
+def _rows(queryset, chunk_size):
+    for row in queryset.values_list(*_QUERY_COLUMNS).order_by("id").iterator(chunk_size=chunk_size):
+        yield row[:-1] + (row[-1].isoformat(),)
+
+
+def _csv_chunks(rows, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending == chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def _json_number(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _ndjson_chunks(rows, chunk_size):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(COLUMNS, row)), default=_json_number))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_results(queryset=None, fmt="csv", chunk_size=2000):
+    """Yield the export of ``queryset`` (all results by default) as text chunks."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    if queryset is None:
+        queryset = UserResult.objects.all()
+    rows = _rows(queryset, chunk_size)
+    chunks = _csv_chunks if fmt == "csv" else _ndjson_chunks
+    return chunks(rows, chunk_size)
+
+
+async def aexport_results(queryset=None, fmt="csv", chunk_size=2000):
+    """Async iterator over the chunks of ``export_results``, for streaming responses under ASGI."""
+    chunks = export_results(queryset, fmt, chunk_size)
+    # Thread-sensitive, so every chunk reads the same database cursor.
+    pull = sync_to_async(next)
+    done = object()
+    while (chunk := await pull(chunks, done)) is not done:
+        yield chunk
@@ -0,0 +1,73 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def _parse_moment(value, end_of_day=False):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date {value!r}; use YYYY-MM-DD or an ISO 8601 datetime.")
+        if end_of_day:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _parse_cgpa(name, value):
+    try:
+        cgpa = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid {name} {value!r}.")
+    if not cgpa.is_finite():
+        raise ValueError(f"Invalid {name} {value!r}.")
+    return cgpa
+
+
+def prefix_range(prefix):
+    """(low, high) such that low <= s < high exactly when s starts with ``prefix``.
+
+    A range keeps prefix search on the email index; SQLite's LIKE is
+    case-insensitive and cannot use it.
+    """
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def filter_results(queryset, params):
+    """Narrow a UserResult queryset by the filters in ``params`` (a dict-like of strings).
+
+    Supported keys: ``department`` (code), ``semester``, ``min_cgpa`` and
+    ``max_cgpa`` (inclusive), ``email`` (exact), ``email_prefix``, ``since``
+    and ``until`` (dates or datetimes; a bare ``until`` date includes that
+    whole day). Raises ValueError for malformed values.
+    """
+    if params.get("department"):
+        queryset = queryset.filter(department__code=params["department"])
+    if params.get("semester"):
+        try:
+            queryset = queryset.filter(semester=int(params["semester"]))
+        except ValueError:
+            raise ValueError(f"Invalid semester {params['semester']!r}.")
+    if params.get("min_cgpa"):
+        queryset = queryset.filter(cgpa__gte=_parse_cgpa("min_cgpa", params["min_cgpa"]))
+    if params.get("max_cgpa"):
+        queryset = queryset.filter(cgpa__lte=_parse_cgpa("max_cgpa", params["max_cgpa"]))
+    if params.get("email"):
+        queryset = queryset.filter(email=params["email"])
+    if params.get("email_prefix"):
+        low, high = prefix_range(params["email_prefix"])
+        queryset = queryset.filter(email__gte=low, email__lt=high)
+    if params.get("since"):
+        queryset = queryset.filter(created_at__gte=_parse_moment(params["since"]))
+    if params.get("until"):
+        until = params["until"]
+        if parse_datetime(until) is None:
+            queryset = queryset.filter(created_at__lt=_parse_moment(until, end_of_day=True))
+        else:
+            queryset = queryset.filter(created_at__lte=_parse_moment(until))
+    return queryset
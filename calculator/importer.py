@@ -0,0 +1,112 @@
+"""Streaming bulk import of UserResult rows from CSV or JSON Lines.
+
+Rows are read lazily from a text stream, validated a chunk at a time and
+upserted with ``bulk_create(update_conflicts=True)`` on the
+(email, department, semester) constraint, one transaction per chunk, so
+memory stays flat regardless of file size. ``department`` is the
+department code; ``arrear_count`` is optional.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+
+from . import aggregates, analytics
+from .models import Department, UserResult
+from .serializers import ResultImportSerializer
+
+FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 50
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def reject(self, line, error):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": self.errors,
+        }
+
+
+def guess_format(filename):
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_rows(stream, fmt):
+    """Yield (line_number, row) pairs; a row is a dict, or an error string for unparsable JSON."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = f"Invalid JSON: {e}"
+            yield line_number, row
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+def import_results(stream, fmt="csv", chunk_size=1000):
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    report = ImportReport()
+    departments = dict(Department.objects.values_list("code", "id"))
+    rows = read_rows(stream, fmt)
+
+    while chunk := list(islice(rows, chunk_size)):
+        report.rows += len(chunk)
+        # Later rows win when a chunk repeats a key, matching save_results.
+        results = {}
+        for line_number, row in chunk:
+            if not isinstance(row, dict):
+                report.reject(line_number, row if isinstance(row, str) else "Expected an object")
+                continue
+            serializer = ResultImportSerializer(data=row, context={"departments": departments})
+            if not serializer.is_valid():
+                report.reject(line_number, serializer.errors)
+                continue
+            result = UserResult(**serializer.validated_data)
+            results[(result.email, result.department_id, result.semester)] = result
+
+        if results:
+            with transaction.atomic():
+                UserResult.objects.bulk_create(
+                    results.values(),
+                    update_conflicts=True,
+                    unique_fields=["email", "department", "semester"],
+                    update_fields=["cgpa", "total_credits", "total_grade_points", "arrear_count", "created_at"],
+                )
+                aggregates.refresh((email, department_id) for email, department_id, _ in results)
+                # Marked with the chunk, so a later chunk failing cannot leave these summaries current.
+                analytics.mark_stale((department_id, semester) for _, department_id, semester in results)
+            report.imported += len(results)
+
+    report.elapsed = time.perf_counter() - report.started
+    return report
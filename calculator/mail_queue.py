@@ -0,0 +1,172 @@
+"""Outbound email queue backed by the OutboundEmail table.
+
+Views call ``enqueue`` and return immediately; delivery happens in
+``process_batch``, which claims due messages, sends them over one reused
+backend connection and reschedules failures with exponential backoff.
+Batches are drained either by the ``process_email_queue`` management
+command or, when ``EMAIL_QUEUE["INLINE_WORKER"]`` is on, by a daemon thread
+in the web process that wakes after each enqueue commits.
+
+A claim is one conditional UPDATE that pushes ``next_attempt_at`` forward
+by the lease and stamps the rows with the worker's token, and only rows
+still pending and due match it. Of several workers that picked the same
+due rows, only the first claims each, and the others re-select nothing for
+their token; a crashed worker's rows become due again once the lease ends.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BATCH_SIZE": 50,
+    "MAX_ATTEMPTS": 5,
+    "RETRY_BASE_SECONDS": 30,
+    "RETRY_MAX_SECONDS": 60 * 60,
+    "LEASE_SECONDS": 120,
+    "INLINE_WORKER": False,
+    "POLL_SECONDS": 30,
+}
+
+
+def queue_setting(name):
+    return getattr(settings, "EMAIL_QUEUE", {}).get(name, DEFAULTS[name])
+
+
+def enqueue(recipient, subject, body, from_email=None):
+    email = OutboundEmail.objects.create(
+        recipient=recipient,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=body,
+    )
+    if queue_setting("INLINE_WORKER"):
+        transaction.on_commit(wake_worker)
+    return email
+
+
+def retry_delay(attempts):
+    delay = queue_setting("RETRY_BASE_SECONDS") * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, queue_setting("RETRY_MAX_SECONDS")))
+
+
+def _due(now):
+    return OutboundEmail.objects.filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+
+
+def _due_ids(now, batch_size):
+    return list(_due(now).order_by("next_attempt_at").values_list("pk", flat=True)[:batch_size])
+
+
+def claim_batch(batch_size):
+    """Lease up to ``batch_size`` due messages to this worker and return them."""
+    now = timezone.now()
+    ids = _due_ids(now, batch_size)
+    if not ids:
+        return []
+    # SQLite has no SELECT ... FOR UPDATE SKIP LOCKED, so the UPDATE itself
+    # re-checks that each row is still claimable.
+    token = uuid.uuid4().hex
+    _due(now).filter(pk__in=ids).update(
+        next_attempt_at=now + timedelta(seconds=queue_setting("LEASE_SECONDS")), claim_token=token
+    )
+    return list(OutboundEmail.objects.filter(pk__in=ids, claim_token=token).order_by("next_attempt_at"))
+
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= queue_setting("MAX_ATTEMPTS"):
+        email.status = OutboundEmail.FAILED
+        logger.error("Giving up on email %s to %s: %s", email.pk, email.recipient, error)
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def process_batch(batch_size=None):
+    """Send one batch of due messages; returns how many were claimed."""
+    batch = claim_batch(batch_size or queue_setting("BATCH_SIZE"))
+    if not batch:
+        return 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        metrics.EMAILS.inc(len(batch), outcome="connect_failed")
+        for email in batch:
+            _record_failure(email, e)
+        return len(batch)
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=[email.recipient],
+                connection=connection,
+            )
+            started = time.perf_counter()
+            try:
+                message.send()
+            except Exception as e:
+                metrics.EMAILS.inc(outcome="failed")
+                _record_failure(email, e)
+                continue
+            finally:
+                metrics.SMTP_SECONDS.observe(time.perf_counter() - started)
+            metrics.EMAILS.inc(outcome="sent")
+            email.status = OutboundEmail.SENT
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.save(update_fields=["status", "attempts", "sent_at"])
+    finally:
+        connection.close()
+    return len(batch)
+
+
+def drain():
+    """Process batches until nothing is due."""
+    sent = 0
+    while claimed := process_batch():
+        sent += claimed
+    return sent
+
+
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _run_worker():
+    while True:
+        _wakeup.wait(timeout=queue_setting("POLL_SECONDS"))
+        _wakeup.clear()
+        try:
+            drain()
+        except Exception:
+            logger.exception("Email queue worker failed")
+        finally:
+            close_old_connections()
+
+
+def wake_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name="email-queue", daemon=True)
+            _worker.start()
+    _wakeup.set()
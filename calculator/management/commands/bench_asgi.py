@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import include, path
+
+from calculator import async_views, views
+from calculator.benchmarking import Timer, format_row, summarize
+from calculator.models import CGPAAggregate, Subject
+from calculator.urls import build_urlpatterns
+
+def _serving(read_views):
+    """Settings that route the test client's requests to ``read_views``."""
+    urlconf = ModuleType(f"bench_urls_{read_views.__name__.rpartition('.')[2]}")
+    urlconf.urlpatterns = [path("api/", include(build_urlpatterns(read_views)))]
+    return override_settings(ROOT_URLCONF=urlconf, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"])
+
+
+def _routes():
+    """GET paths for the read endpoints, using a real student and curriculum entry."""
+    routes = {"departments": ("/api/departments/", {}), "semesters": ("/api/semesters/", {})}
+    subject = Subject.objects.select_related("semester", "department").first()
+    if subject:
+        routes["subjects"] = (f"/api/subjects/{subject.semester.number}/{subject.department.code}/", {})
+    student = CGPAAggregate.objects.filter(department__isnull=False, total_credits__gt=0).order_by("-id").first()
+    if student:
+        params = {"email": student.email, "dept_id": student.department_id}
+        routes["user-history"] = ("/api/user-history/", params)
+        routes["calculate-cgpa"] = ("/api/calculate-cgpa/", params)
+    return routes
+
+
+def run_wsgi(url, params, total, concurrency):
+    """``concurrency`` threads, one test client each, against the DRF views."""
+    timer = Timer()
+
+    def worker(count):
+        client = Client()
+        try:
+            for _ in range(count):
+                with Timer() as one:
+                    response = client.get(url, params)
+                response.close()
+                timer.record(one.finished - one.started, ok=response.status_code < 400)
+        finally:
+            connections.close_all()
+
+    shares = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+    with _serving(views), timer:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, shares))
+    return summarize(timer)
+
+
+def run_asgi(url, params, total, concurrency):
+    """``concurrency`` in-flight requests on one event loop against the async views."""
+    timer = Timer()
+
+    async def main():
+        client = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one_request():
+            async with gate:
+                with Timer() as one:
+                    response = await client.get(url, params)
+                timer.record(one.finished - one.started, ok=response.status_code < 400)
+
+        with timer:
+            await asyncio.gather(*(one_request() for _ in range(total)))
+
+    with _serving(async_views):
+        asyncio.run(main())
+    return summarize(timer)
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent throughput of the read endpoints under the WSGI (sync) and ASGI (async) views."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per route and mode.")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--route", action="append", help="Only these routes (repeatable).")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        routes = _routes()
+        selected = options["route"] or list(routes)
+        unknown = set(selected) - set(routes)
+        if unknown:
+            raise CommandError(f"Unknown or unavailable routes: {', '.join(sorted(unknown))}")
+
+        for name in selected:
+            url, params = routes[name]
+            # Warm caches and connections so both modes measure steady state.
+            run_wsgi(url, params, options["concurrency"], options["concurrency"])
+            run_asgi(url, params, options["concurrency"], options["concurrency"])
+            self.stdout.write(format_row(f"{name} wsgi", run_wsgi(url, params, options["requests"], options["concurrency"])))
+            self.stdout.write(format_row(f"{name} asgi", run_asgi(url, params, options["requests"], options["concurrency"])))
@@ -0,0 +1,86 @@
+import json
+import os
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.utils import timezone
+
+from calculator.benchmarking import (
+    ENDPOINTS, bench_fixture, compare, format_row, run_endpoint, test_client_settings, uncovered_routes,
+)
+from calculator.models import UserResult
+from calculator.urls import urlpatterns
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API route in-process against the seeded data (see seed_benchmark_data): "
+        "p50/p95/p99 latency, requests/s and SQL queries per request, compared with a JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Measured requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per endpoint first.")
+        parser.add_argument("--only", action="append", help="Only endpoints with this label (repeatable).")
+        parser.add_argument("--baseline", default="bench_baseline.json", help="Baseline file to compare with or write.")
+        parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional p95 growth.")
+        parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p95 growth smaller than this.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be positive.")
+        fixture = bench_fixture()
+        if fixture is None:
+            raise CommandError("No benchmark data found; run `python manage.py seed_benchmark_data` first.")
+        endpoints = [e for e in ENDPOINTS if not options["only"] or e.label in options["only"]]
+        for route in uncovered_routes(urlpatterns):
+            self.stderr.write(self.style.WARNING(f"No benchmark defined for route {route!r}"))
+
+        results = {}
+        # Nothing the run writes (admin user, session, OTPs, saves) outlives it.
+        with test_client_settings(DEBUG=False, EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"):
+            with transaction.atomic():
+                client = Client()
+                admin = get_user_model().objects.create_user("bench-admin", password=None, is_staff=True)
+                admin_client = Client()
+                admin_client.force_login(admin)
+                for endpoint in endpoints:
+                    stats = run_endpoint(
+                        admin_client if endpoint.admin else client, endpoint, fixture,
+                        options["requests"], options["warmup"],
+                    )
+                    results[endpoint.label] = stats
+                    self.stdout.write(format_row(endpoint.label, stats))
+                transaction.set_rollback(True)
+
+        path = options["baseline"]
+        if options["save_baseline"]:
+            baseline = {
+                "meta": {
+                    "created": timezone.now().isoformat(),
+                    "django": django.get_version(),
+                    "results": UserResult.objects.count(),
+                    "requests": options["requests"],
+                },
+                "endpoints": results,
+            }
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {path}"))
+            return
+
+        if not os.path.exists(path):
+            self.stdout.write(f"No baseline at {path}; rerun with --save-baseline to record one.")
+            return
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline["endpoints"], results, options["tolerance"], options["min_delta_ms"])
+        if regressions:
+            for line in regressions:
+                self.stderr.write(self.style.ERROR(line))
+            raise CommandError(f"{len(regressions)} regression(s) against {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}"))
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from calculator.benchmarking import Timer, bench_fixture, format_row, summarize, test_client_settings
+from calculator.compression import brotli
+from calculator.renderers import FastJSONRenderer, orjson
+
+ENCODINGS = ["identity", "gzip"] + (["br"] if brotli else [])
+
+
+def _payloads(fixture):
+    """(label, path, params) for the largest responses the API returns."""
+    return [
+        ("user-history x100", "/api/user-history/",
+         {"email": fixture["email"], "dept_id": fixture["department_id"], "page_size": 100}),
+        ("admin-results x100", "/api/admin-results/", {"page_size": 100}),
+        ("curriculum", f"/api/curriculum/{fixture['department_code']}/", {}),
+        ("admin export", "/api/admin/export-results/", {"department": fixture["department_code"]}),
+    ]
+
+
+def _body(response):
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+class Command(BaseCommand):
+    help = (
+        "Bytes on the wire per encoding (identity/gzip/br) for the largest API responses, "
+        "and JSON render time with DRF's JSONRenderer vs FastJSONRenderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Renders timed per payload and renderer.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be positive.")
+        fixture = bench_fixture()
+        if fixture is None:
+            raise CommandError("No benchmark data found; run `python manage.py seed_benchmark_data` first.")
+        if orjson is None:
+            self.stderr.write(self.style.WARNING("orjson is not installed; FastJSONRenderer falls back to the stdlib."))
+        if brotli is None:
+            self.stderr.write(self.style.WARNING("brotli is not installed; only gzip is measured."))
+
+        renderers = {"JSONRenderer": JSONRenderer(), "FastJSONRenderer": FastJSONRenderer()}
+        with test_client_settings(DEBUG=False), transaction.atomic():
+            # Logged in as staff for the export; nothing written outlives the run.
+            admin = get_user_model().objects.create_user("bench-admin", password=None, is_staff=True)
+            client = Client()
+            client.force_login(admin)
+            for label, path, params in _payloads(fixture):
+                sizes = {}
+                for encoding in ENCODINGS:
+                    response = client.get(path, params, HTTP_ACCEPT_ENCODING=encoding)
+                    if response.status_code != 200:
+                        raise CommandError(f"{label}: HTTP {response.status_code}")
+                    sizes[encoding] = len(_body(response))
+                identity = sizes["identity"]
+                on_wire = "  ".join(
+                    f"{encoding}={size:,}B ({size / identity:.0%})" for encoding, size in sizes.items()
+                )
+                self.stdout.write(f"{label:<28} {on_wire}")
+
+                data = getattr(response, "data", None)
+                if data is None:
+                    continue
+                renders_per_second = {}
+                for name, renderer in renderers.items():
+                    timer = Timer()
+                    with timer:
+                        for _ in range(options["requests"]):
+                            with Timer() as one:
+                                renderer.render(data)
+                            timer.record(one.finished - one.started)
+                    stats = summarize(timer)
+                    renders_per_second[name] = stats["rps"]
+                    self.stdout.write("  " + format_row(name, stats))
+                speedup = renders_per_second["FastJSONRenderer"] / renders_per_second["JSONRenderer"]
+                self.stdout.write(f"  {len(renderer.render(data)):,}B of JSON, rendered {speedup:.1f}x faster")
+            transaction.set_rollback(True)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.benchmarking import Timer, format_row, summarize
+from calculator.models import UserResult
+from calculator.pagination import DynamicPageNumberPagination
+from calculator.serializers import USER_RESULT_VALUES, UserSerializer
+
+
+def model_serializer_page(queryset, size):
+    return UserSerializer(list(queryset[:size]), many=True).data
+
+
+def values_page(queryset, size):
+    return USER_RESULT_VALUES.serialize(list(USER_RESULT_VALUES.values(queryset)[:size]))
+
+
+PATHS = {"ModelSerializer": model_serializer_page, "values": values_page}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare fetching and serializing one page of results through UserSerializer "
+        "with the .values() fast path, at page sizes up to max_page_size."
+    )
+
+    def add_arguments(self, parser):
+        max_size = DynamicPageNumberPagination.max_page_size
+        parser.add_argument("--sizes", type=int, nargs="+", default=[5, 8, 25, 50, max_size])
+        parser.add_argument("--requests", type=int, default=200, help="Pages built per path and size.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be positive.")
+        sizes = options["sizes"]
+        if max(sizes) > UserResult.objects.count():
+            raise CommandError("Not enough results; run `python manage.py seed_benchmark_data` first.")
+        queryset = UserResult.objects.order_by("-created_at")
+
+        for size in sizes:
+            rows_per_second = {}
+            for name, build in PATHS.items():
+                build(queryset, size)
+                timer = Timer()
+                with timer:
+                    for _ in range(options["requests"]):
+                        with Timer() as one:
+                            build(queryset, size)
+                        timer.record(one.finished - one.started)
+                stats = summarize(timer)
+                rows_per_second[name] = stats["rps"] * size
+                self.stdout.write(format_row(f"{name} x{size}", stats))
+            speedup = rows_per_second["values"] / rows_per_second["ModelSerializer"]
+            self.stdout.write(f"  page size {size}: {rows_per_second['values']:,.0f} rows/s, {speedup:.1f}x ModelSerializer")
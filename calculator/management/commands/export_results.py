@@ -0,0 +1,44 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.exporter import FORMATS, export_results
+from calculator.filters import filter_results
+from calculator.models import UserResult
+
+
+class Command(BaseCommand):
+    help = "Stream every UserResult (optionally filtered) to a CSV or NDJSON file in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", default="-", help="Destination file; '-' (default) writes to stdout.")
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--department", help="Department code.")
+        parser.add_argument("--semester", type=int)
+        parser.add_argument("--min-cgpa", help="Lowest CGPA, inclusive.")
+        parser.add_argument("--max-cgpa", help="Highest CGPA, inclusive.")
+        parser.add_argument("--email", help="Exact student email.")
+        parser.add_argument("--email-prefix", help="Student emails starting with this text.")
+        parser.add_argument("--since", help="Earliest created_at (YYYY-MM-DD or ISO 8601).")
+        parser.add_argument("--until", help="Latest created_at (YYYY-MM-DD includes the whole day).")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        filters = ("department", "semester", "min_cgpa", "max_cgpa", "email", "email_prefix", "since", "until")
+        params = {key: options[key] for key in filters if options[key]}
+        try:
+            queryset = filter_results(UserResult.objects.all(), params)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        stream = sys.stdout if options["output"] == "-" else open(options["output"], "w", newline="", encoding="utf-8")
+        try:
+            for chunk in export_results(queryset, options["format"], options["chunk_size"]):
+                stream.write(chunk)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        if options["output"] != "-":
+            self.stderr.write(f"Exported to {options['output']} in {time.perf_counter() - started:.2f}s")
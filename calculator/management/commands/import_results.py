@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator.importer import FORMATS, guess_format, import_results
+
+
+class Command(BaseCommand):
+    help = "Stream results from a CSV or JSON Lines file into UserResult, upserting per (email, department, semester)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import; columns: email, department (code), semester, cgpa, total_credits, total_grade_points.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to jsonl for .jsonl/.ndjson files, csv otherwise.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows validated and written per transaction.")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or guess_format(options["path"])
+        try:
+            with open(options["path"], newline="", encoding="utf-8") as stream:
+                report = import_results(stream, fmt, chunk_size=options["chunk_size"])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['error'])}")
+        if report.rejected > len(report.errors):
+            self.stderr.write(f"... {report.rejected - len(report.errors)} more rejected row(s) not shown")
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {report.rows} row(s): {report.imported} imported, {report.rejected} rejected "
+            f"in {report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/s)"
+        ))
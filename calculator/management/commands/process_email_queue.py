@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from calculator import mail_queue
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound email (OTP messages) in batches over a reused connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling for due messages instead of exiting.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = mail_queue.drain()
+            if sent:
+                self.stdout.write(f"Processed {sent} message(s)")
+            if not options["loop"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from calculator import otp_store
+
+
+class Command(BaseCommand):
+    help = "Delete expired email OTPs in batches. Safe to run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        removed = otp_store.purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired OTP(s)."))
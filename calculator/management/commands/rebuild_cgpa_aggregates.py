@@ -0,0 +1,70 @@
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from calculator import ranking
+from calculator.aggregates import expected_aggregates
+from calculator.models import CGPAAggregate
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or with --verify, check) the per-student CGPA aggregates from UserResult."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report aggregates that drifted from UserResult; exit non-zero if any did.",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            self.verify()
+        else:
+            self.rebuild()
+
+    def verify(self):
+        expected = expected_aggregates()
+        drifted = 0
+        for aggregate in CGPAAggregate.objects.all().iterator():
+            key = (aggregate.email, aggregate.department_id)
+            credits, grade_points, rows = expected.pop(key, (0, 0.0, 0))
+            if (
+                aggregate.total_credits != credits
+                or aggregate.semester_count != rows
+                or not math.isclose(aggregate.total_grade_points, grade_points, abs_tol=1e-6)
+            ):
+                drifted += 1
+                self.stdout.write(
+                    f"Drift for {key}: stored ({aggregate.total_credits}, {aggregate.total_grade_points}, "
+                    f"{aggregate.semester_count}) expected ({credits}, {grade_points}, {rows})"
+                )
+        for key, values in expected.items():
+            drifted += 1
+            self.stdout.write(f"Missing aggregate for {key}: expected {values}")
+
+        if drifted:
+            raise CommandError(f"{drifted} aggregate(s) out of sync; run without --verify to rebuild.")
+        self.stdout.write(self.style.SUCCESS("All aggregates match UserResult."))
+
+    def rebuild(self):
+        expected = expected_aggregates()
+        with transaction.atomic():
+            CGPAAggregate.objects.all().delete()
+            CGPAAggregate.objects.bulk_create(
+                [
+                    CGPAAggregate(
+                        email=email,
+                        department_id=department_id,
+                        total_credits=credits,
+                        total_grade_points=grade_points,
+                        semester_count=rows,
+                    )
+                    for (email, department_id), (credits, grade_points, rows) in expected.items()
+                ],
+                batch_size=1000,
+            )
+        # Only this process's rank index can be reset here; others age out.
+        ranking.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(expected)} aggregate(s)."))
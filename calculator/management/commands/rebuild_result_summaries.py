@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from calculator import analytics
+
+
+class Command(BaseCommand):
+    help = "Recompute every department/semester CGPA summary from UserResult (schedule after bulk changes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale", action="store_true",
+                            help="Only recompute the summaries writes have marked stale.")
+
+    def handle(self, *args, **options):
+        if options["stale"]:
+            groups = analytics.refresh_stale()
+            self.stdout.write(self.style.SUCCESS(f"Refreshed {groups} stale summary row(s)."))
+            return
+        groups = analytics.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {groups} summary row(s)."))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calculator import seeding
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic departments, subjects and student results for benchmarking (or --clear them)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=5)
+        parser.add_argument("--semesters", type=int, default=8)
+        parser.add_argument("--subjects", type=int, default=6, help="Subjects per department and semester.")
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--results-per-student", type=int, default=4, help="Semesters with a saved result per student.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Results written per transaction.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, for reproducible datasets.")
+        parser.add_argument("--clear", action="store_true", help="Remove all benchmark data instead of seeding.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options["clear"]:
+            removed = seeding.clear()
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} benchmark result(s) in {time.perf_counter() - started:.1f}s."))
+            return
+
+        try:
+            written = seeding.seed(
+                departments=options["departments"],
+                semesters=options["semesters"],
+                subjects=options["subjects"],
+                students=options["students"],
+                results_per_student=options["results_per_student"],
+                chunk_size=options["chunk_size"],
+                random_seed=options["seed"],
+                progress=lambda n: self.stderr.write(f"\r{n} results", ending=""),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        self.stderr.write("")
+        self.stdout.write(self.style.SUCCESS(f"Seeded {written} result(s) in {elapsed:.1f}s ({written / elapsed:.0f} rows/s)."))
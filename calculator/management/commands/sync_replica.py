@@ -0,0 +1,36 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from calculator.db_router import REPLICA_ALIAS, replica_configured
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database onto the SQLite read replica with the online backup API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=1024, help="Pages copied per step; the primary stays writable between steps.")
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError("No replica configured; set CGPA_REPLICA to a SQLite file path.")
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[REPLICA_ALIAS]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("sync_replica only copies SQLite files; use the database's own replication otherwise.")
+
+        started = time.perf_counter()
+        replica.close()
+        source = sqlite3.connect(primary.settings_dict["NAME"])
+        target = sqlite3.connect(replica.settings_dict["NAME"])
+        try:
+            with target:
+                source.backup(target, pages=options["pages"])
+            target.execute("PRAGMA journal_mode=WAL")
+        finally:
+            source.close()
+            target.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Replica {replica.settings_dict['NAME']} synced in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,199 @@
+"""In-process request, database, email and OTP metrics in Prometheus text format.
+
+``MetricsMiddleware`` times every request and counts its SQL queries and
+database time with an ``execute_wrapper`` on every database alias, the
+read replica included; the mail queue and OTP
+store record SMTP send time and outcomes, and the OTP throttles their
+decisions. ``render`` serves everything at
+``/metrics``. Each histogram is a fixed list of buckets updated under one
+lock, so recording costs a bisect and a few additions.
+
+Like the rank index, the registry lives in each worker process; Prometheus
+scrapes every worker and sums the series.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SMTP_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+_registry = []
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield f"{self.name}_total{_label_text(zip(self.labelnames, key))} {value}"
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self.values = {}
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            row = self.values.get(key)
+            if row is None:
+                row = self.values[key] = [0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def samples(self):
+        for key, row in sorted(self.values.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), row):
+                cumulative += count
+                yield f"{self.name}_bucket{_label_text(labels + [('le', bound)])} {cumulative}"
+            yield f"{self.name}_sum{_label_text(labels)} {row[-1]}"
+            yield f"{self.name}_count{_label_text(labels)} {cumulative}"
+
+
+REQUESTS = Counter("cgpa_http_requests", "HTTP responses by route, method and status.", ("route", "method", "status"))
+REQUEST_SECONDS = Histogram("cgpa_http_request_duration_seconds", "Request latency.", ("route", "method"))
+DB_QUERIES = Histogram("cgpa_db_queries_per_request", "SQL queries issued per request.", ("route",), QUERY_BUCKETS)
+DB_SECONDS = Histogram("cgpa_db_duration_seconds", "Time spent in SQL per request.", ("route",))
+SMTP_SECONDS = Histogram("cgpa_smtp_send_duration_seconds", "Time spent sending one queued email over SMTP.", (), SMTP_BUCKETS)
+EMAILS = Counter("cgpa_emails", "Queued email send attempts by outcome.", ("outcome",))
+OTP_ISSUED = Counter("cgpa_otp_issued", "OTP codes issued.")
+OTP_VERIFICATIONS = Counter("cgpa_otp_verifications", "OTP verification attempts by outcome.", ("outcome",))
+THROTTLE_DECISIONS = Counter("cgpa_throttle_decisions", "Throttle checks by scope and outcome.", ("scope", "outcome"))
+
+
+def render():
+    lines = []
+    with _lock:
+        for metric in _registry:
+            kind = "histogram" if isinstance(metric, Histogram) else "counter"
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+class QueryCounter:
+    """Execute wrapper that counts queries and their total time; attach it with ``counting``."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - started
+
+
+@contextmanager
+def counting(counter):
+    """Wrap the current thread's connection for every alias in ``counter`` for the block."""
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(counter))
+        yield counter
+
+
+def _attach(counter):
+    for conn in connections.all():
+        conn.execute_wrappers.append(counter)
+
+
+def _detach(counter):
+    for conn in connections.all():
+        conn.execute_wrappers.remove(counter)
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    return match.route if match else "unmatched"
+
+
+class MetricsMiddleware:
+    """Record latency, SQL queries and DB time per route.
+
+    With ``METRICS_SERVER_TIMING`` on, the same numbers are sent back in a
+    ``Server-Timing`` header for the browser's network panel.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "METRICS_SERVER_TIMING", False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with counting(counter):
+            response = self.get_response(request)
+        return self.record(request, response, counter, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        # Database connections are per thread, and async views query from the
+        # request's sync thread, so the wrapper has to be attached there.
+        counter = QueryCounter()
+        started = time.perf_counter()
+        await sync_to_async(_attach)(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_detach)(counter)
+        return self.record(request, response, counter, time.perf_counter() - started)
+
+    def record(self, request, response, counter, elapsed):
+        route = _route(request)
+        if route == "metrics":
+            return response
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        REQUEST_SECONDS.observe(elapsed, route=route, method=request.method)
+        DB_QUERIES.observe(counter.queries, route=route)
+        DB_SECONDS.observe(counter.seconds, route=route)
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={counter.seconds * 1000:.2f};desc="{counter.queries} queries", '
+                f"total;dur={elapsed * 1000:.2f}"
+            )
+        return response
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_aggregates(apps, schema_editor):
+    UserResult = apps.get_model('calculator', 'UserResult')
+    CGPAAggregate = apps.get_model('calculator', 'CGPAAggregate')
+    totals = (
+        UserResult.objects.values('email', 'department')
+        .annotate(credits=Sum('total_credits'), grade_points=Sum('total_grade_points'), rows=Count('id'))
+        .order_by()
+    )
+    CGPAAggregate.objects.bulk_create(
+        CGPAAggregate(
+            email=row['email'],
+            department_id=row['department'],
+            total_credits=row['credits'] or 0,
+            total_grade_points=row['grade_points'] or 0.0,
+            semester_count=row['rows'],
+        )
+        for row in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0009_alter_userresult_department'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CGPAAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('total_credits', models.IntegerField(default=0)),
+                ('total_grade_points', models.FloatField(default=0.0)),
+                ('semester_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='calculator.department')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('email', 'department'), name='unique_cgpa_aggregate')],
+            },
+        ),
+        migrations.RunPython(populate_aggregates, migrations.RunPython.noop),
+    ]
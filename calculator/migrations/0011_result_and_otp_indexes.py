@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0010_cgpaaggregate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['email', 'otp', 'created_at'], name='emailotp_email_otp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['department', 'semester'], name='subject_dept_sem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userresult',
+            index=models.Index(fields=['email', 'department', 'semester'], name='userresult_email_dept_sem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userresult',
+            index=models.Index(fields=['created_at'], name='userresult_created_at_idx'),
+        ),
+    ]
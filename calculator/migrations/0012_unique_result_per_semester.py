@@ -0,0 +1,71 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:22
+
+import logging
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+logger = logging.getLogger(__name__)
+
+REPORTED_KEYS = 20
+
+
+def drop_duplicate_results(apps, schema_editor):
+    """Keep only the newest row per (email, department, semester) so the constraint can be added.
+
+    Newest is the highest id, i.e. the last save, which is the row the app
+    showed. The number of rows removed and the first keys are logged.
+    """
+    UserResult = apps.get_model('calculator', 'UserResult')
+    CGPAAggregate = apps.get_model('calculator', 'CGPAAggregate')
+    duplicates = (
+        UserResult.objects.filter(department__isnull=False)
+        .values('email', 'department', 'semester')
+        .annotate(rows=Count('id'), keep=Max('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    removed = 0
+    examples = []
+    for group in duplicates:
+        deleted, _ = UserResult.objects.filter(
+            email=group['email'], department=group['department'], semester=group['semester']
+        ).exclude(id=group['keep']).delete()
+        removed += deleted
+        if len(examples) < REPORTED_KEYS:
+            examples.append(
+                f"({group['email']}, department={group['department']}, semester={group['semester']}) kept id={group['keep']}"
+            )
+        totals = UserResult.objects.filter(email=group['email'], department=group['department']).aggregate(
+            credits=Sum('total_credits'), grade_points=Sum('total_grade_points'), rows=Count('id')
+        )
+        CGPAAggregate.objects.filter(email=group['email'], department=group['department']).update(
+            total_credits=totals['credits'] or 0,
+            total_grade_points=totals['grade_points'] or 0.0,
+            semester_count=totals['rows'],
+        )
+
+    if removed:
+        logger.warning(
+            "Removed %d duplicate UserResult row(s), keeping the newest per semester; first %d key(s): %s",
+            removed, len(examples), ", ".join(examples),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0011_result_and_otp_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userresult',
+            constraint=models.UniqueConstraint(fields=('email', 'department', 'semester'), name='unique_result_per_semester'),
+        ),
+        migrations.RemoveIndex(
+            model_name='userresult',
+            name='userresult_email_dept_sem_idx',
+        ),
+    ]
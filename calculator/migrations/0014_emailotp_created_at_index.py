@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0013_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['created_at'], name='emailotp_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0014_emailotp_created_at_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='userresult',
+            name='userresult_created_at_idx',
+        ),
+        migrations.AddIndex(
+            model_name='userresult',
+            index=models.Index(fields=['created_at', 'id'], name='userresult_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:28
+
+import math
+from itertools import groupby
+
+import django.db.models.deletion
+import numpy as np
+from django.db import migrations, models
+
+# Frozen copies of calculator.analytics' settings at the time of this
+# migration; later changes there must not alter it.
+PERCENTILES = (10, 25, 75, 90)
+HISTOGRAM_EDGES = np.linspace(0, 10, 11)
+
+
+def parse_cgpa(text):
+    # cgpa is still text here; 0017 converts it with the same bounds.
+    try:
+        value = float(str(text).strip().replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) and 0 <= value <= 10 else None
+
+
+def summarize(cgpas, arrears):
+    cgpas = np.asarray([c for c in cgpas if c is not None], dtype=np.float64)
+    arrears = np.asarray(arrears, dtype=np.int64)
+    values = {
+        'count': int(arrears.size),
+        'pass_count': int(np.count_nonzero(arrears == 0)),
+        'histogram': [0] * (len(HISTOGRAM_EDGES) - 1),
+    }
+    if cgpas.size:
+        points = np.percentile(cgpas, PERCENTILES)
+        values.update(
+            mean=round(float(cgpas.mean()), 4),
+            median=round(float(np.median(cgpas)), 4),
+            minimum=float(cgpas.min()),
+            maximum=float(cgpas.max()),
+            percentiles={f'p{p}': round(float(v), 4) for p, v in zip(PERCENTILES, points)},
+            histogram=np.histogram(cgpas, bins=HISTOGRAM_EDGES)[0].tolist(),
+        )
+    return values
+
+
+def populate_summaries(apps, schema_editor):
+    """Build every summary from UserResult, one ordered pass per (department, semester)."""
+    UserResult = apps.get_model('calculator', 'UserResult')
+    ResultSummary = apps.get_model('calculator', 'ResultSummary')
+    rows = (
+        UserResult.objects.order_by('department_id', 'semester')
+        .values_list('department_id', 'semester', 'cgpa', 'arrear_count')
+        .iterator(chunk_size=5000)
+    )
+    summaries = []
+    for (department_id, semester), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        _, _, cgpas, arrears = zip(*group)
+        values = summarize([parse_cgpa(cgpa) for cgpa in cgpas], arrears)
+        summaries.append(ResultSummary(department_id=department_id, semester=semester, **values))
+    ResultSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0015_userresult_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('pass_count', models.IntegerField(default=0)),
+                ('mean', models.FloatField(null=True)),
+                ('median', models.FloatField(null=True)),
+                ('minimum', models.FloatField(null=True)),
+                ('maximum', models.FloatField(null=True)),
+                ('percentiles', models.JSONField(default=dict)),
+                ('histogram', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='userresult',
+            name='arrear_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='userresult',
+            index=models.Index(fields=['department', 'semester'], name='userresult_dept_sem_idx'),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='calculator.department'),
+        ),
+        migrations.AddConstraint(
+            model_name='resultsummary',
+            constraint=models.UniqueConstraint(fields=('department', 'semester'), name='unique_result_summary'),
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+REPORTED_ROWS = 20
+
+
+def parse_cgpa(text):
+    try:
+        value = Decimal(str(text).strip().replace(",", "."))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    if not value.is_finite() or not 0 <= value <= 10:
+        return None
+    return value.quantize(Decimal("0.01"))
+
+
+def convert_cgpa(apps, schema_editor):
+    """Copy the text CGPA into the decimal column a chunk of rows at a time, reporting what does not parse."""
+    UserResult = apps.get_model('calculator', 'UserResult')
+    unparsable = 0
+    examples = []
+    last_pk = 0
+    while True:
+        rows = list(UserResult.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'cgpa')[:CHUNK_SIZE])
+        if not rows:
+            break
+        for row in rows:
+            row.cgpa_decimal = parse_cgpa(row.cgpa)
+            if row.cgpa_decimal is None:
+                unparsable += 1
+                if len(examples) < REPORTED_ROWS:
+                    examples.append(f"id={row.pk} cgpa={row.cgpa!r}")
+        UserResult.objects.bulk_update(rows, ['cgpa_decimal'])
+        last_pk = rows[-1].pk
+
+    if unparsable:
+        logger.warning(
+            "%d UserResult cgpa value(s) could not be parsed and were set to NULL; first %d: %s",
+            unparsable, len(examples), ", ".join(examples),
+        )
+
+
+def restore_text(apps, schema_editor):
+    UserResult = apps.get_model('calculator', 'UserResult')
+    last_pk = 0
+    while rows := list(UserResult.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'cgpa_decimal')[:CHUNK_SIZE]):
+        for row in rows:
+            row.cgpa = "" if row.cgpa_decimal is None else format(row.cgpa_decimal.normalize(), "f")
+        UserResult.objects.bulk_update(rows, ['cgpa'])
+        last_pk = rows[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0016_resultsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userresult',
+            name='cgpa_decimal',
+            field=models.DecimalField(decimal_places=2, max_digits=4, null=True),
+        ),
+        # Nullable while both columns exist, so the text column can be
+        # re-created empty when migrating backwards.
+        migrations.AlterField(
+            model_name='userresult',
+            name='cgpa',
+            field=models.CharField(null=True),
+        ),
+        migrations.RunPython(convert_cgpa, restore_text),
+        migrations.RemoveField(
+            model_name='userresult',
+            name='cgpa',
+        ),
+        migrations.RenameField(
+            model_name='userresult',
+            old_name='cgpa_decimal',
+            new_name='cgpa',
+        ),
+        migrations.AddIndex(
+            model_name='userresult',
+            index=models.Index(fields=['department', 'cgpa'], name='userresult_dept_cgpa_idx'),
+        ),
+    ]
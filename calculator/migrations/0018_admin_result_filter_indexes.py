@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0017_userresult_cgpa_decimal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userresult',
+            index=models.Index(fields=['department', 'created_at', 'id'], name='userresult_dept_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userresult',
+            index=models.Index(fields=['cgpa'], name='userresult_cgpa_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0018_admin_result_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cgpaaggregate',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
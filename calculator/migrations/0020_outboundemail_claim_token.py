@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0019_cgpaaggregate_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='claim_token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:04
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_cgpa_sums(apps, schema_editor):
+    UserResult = apps.get_model('calculator', 'UserResult')
+    ResultSummary = apps.get_model('calculator', 'ResultSummary')
+    totals = UserResult.objects.values('department', 'semester').annotate(total=Sum('cgpa')).order_by()
+    for row in totals:
+        ResultSummary.objects.filter(department=row['department'], semester=row['semester']).update(
+            cgpa_sum=float(row['total'] or 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0020_outboundemail_claim_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultsummary',
+            name='cgpa_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='stale',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(populate_cgpa_sums, migrations.RunPython.noop),
+    ]
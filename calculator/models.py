@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class EmailOTP(models.Model):
@@ -6,6 +7,12 @@ class EmailOTP(models.Model):
     otp = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["email", "otp", "created_at"], name="emailotp_email_otp_idx"),
+            models.Index(fields=["created_at"], name="emailotp_created_at_idx"),
+        ]
+
     def __str__(self):
         return f"{self.email} - {self.otp}"
     
@@ -31,19 +38,117 @@ class Subject(models.Model):
     semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name='subjects')
     department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='subjects',null=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["department", "semester"], name="subject_dept_sem_idx"),
+        ]
+
     def __str__(self):
         return f"{self.code} - {self.name}"
 
 
 class UserResult(models.Model):
     email = models.EmailField()
-    cgpa = models.CharField()
+    # NULL only for legacy rows whose text CGPA could not be parsed (migration 0017).
+    cgpa = models.DecimalField(max_digits=4, decimal_places=2, null=True)
     semester = models.IntegerField(default=1)
     department = models.ForeignKey(Department, on_delete=models.CASCADE,null=True,blank=True)
     total_credits = models.IntegerField(default=0)             
     total_grade_points = models.FloatField(default=0.0)        
+    arrear_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["email", "department", "semester"], name="unique_result_per_semester"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="userresult_created_id_idx"),
+            models.Index(fields=["department", "semester"], name="userresult_dept_sem_idx"),
+            models.Index(fields=["department", "cgpa"], name="userresult_dept_cgpa_idx"),
+            # Admin search: a department's newest results, and CGPA ranges across departments.
+            models.Index(fields=["department", "created_at", "id"], name="userresult_dept_created_idx"),
+            models.Index(fields=["cgpa"], name="userresult_cgpa_idx"),
+        ]
+
     def __str__(self):
         return f"{self.email} - CGPA: {self.cgpa}"
-    
+
+
+class CGPAAggregate(models.Model):
+    email = models.EmailField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True)
+    total_credits = models.IntegerField(default=0)
+    total_grade_points = models.FloatField(default=0.0)
+    semester_count = models.IntegerField(default=0)
+    # Bumped with every change to this student's results; tags user-history responses.
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["email", "department"], name="unique_cgpa_aggregate"),
+        ]
+
+    @property
+    def cgpa(self):
+        if not self.total_credits:
+            return None
+        return round(self.total_grade_points / self.total_credits, 2)
+
+    def __str__(self):
+        return f"{self.email} - CGPA: {self.cgpa}"
+
+
+class OutboundEmail(models.Model):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (SENT, "Sent"), (FAILED, "Failed")]
+
+    recipient = models.EmailField()
+    from_email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outboundemail_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient} - {self.subject} ({self.status})"
+
+
+class ResultSummary(models.Model):
+    """Precomputed CGPA distribution for one department and semester."""
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True)
+    semester = models.IntegerField()
+    count = models.IntegerField(default=0)
+    pass_count = models.IntegerField(default=0)
+    # Sum of the non-NULL CGPAs, so writes can update the mean in place.
+    cgpa_sum = models.FloatField(default=0)
+    mean = models.FloatField(null=True)
+    median = models.FloatField(null=True)
+    minimum = models.FloatField(null=True)
+    maximum = models.FloatField(null=True)
+    percentiles = models.JSONField(default=dict)
+    histogram = models.JSONField(default=list)
+    # Median and percentiles lag behind the counts until refresh_stale runs.
+    stale = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["department", "semester"], name="unique_result_summary"),
+        ]
+
+    def __str__(self):
+        return f"{self.department} - Semester {self.semester}: {self.count} results"
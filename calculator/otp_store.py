@@ -0,0 +1,124 @@
+"""Issue and verify email OTPs.
+
+Live codes are cached with a native TTL so verification skips the
+EmailOTP search; the table stays the source of truth and is consulted on a
+cache miss (eviction, restart, another process's local cache). A code is
+consumed by deleting its row, so it verifies at most once, and
+``purge_expired`` removes stale rows in batches.
+"""
+import hashlib
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from . import mail_queue, metrics
+from .models import EmailOTP
+
+VERIFIED = "verified"
+INVALID = "invalid"
+EXPIRED = "expired"
+
+
+def _cache():
+    return caches[settings.OTP_CACHE_ALIAS]
+
+
+def _ttl():
+    return timedelta(seconds=settings.OTP_TTL_SECONDS)
+
+
+def _key(email, otp):
+    return "otp:" + hashlib.sha256(f"{email}:{otp}".encode()).hexdigest()
+
+
+def issue(email):
+    otp = str(random.SystemRandom().randint(100000, 999999))
+    record = EmailOTP.objects.create(email=email, otp=otp)
+    metrics.OTP_ISSUED.inc()
+    transaction.on_commit(
+        lambda: _cache().set(_key(email, otp), record.pk, timeout=settings.OTP_TTL_SECONDS)
+    )
+    return otp
+
+
+def issue_and_send(email):
+    """Issue a code and queue the email carrying it, atomically."""
+    with transaction.atomic():
+        otp = issue(email)
+        mail_queue.enqueue(
+            recipient=email,
+            subject="Your CGPA Calculator OTP",
+            body=f"Your OTP is {otp}",
+            from_email="pradeepkumarravi.softsuave@gmail.com",
+        )
+    return otp
+
+
+def _consume(pk):
+    deleted, _ = EmailOTP.objects.filter(pk=pk).delete()
+    return deleted > 0
+
+
+def verify(email, otp):
+    outcome = _verify(email, otp)
+    metrics.OTP_VERIFICATIONS.inc(outcome=outcome)
+    return outcome
+
+
+def _verify(email, otp):
+    key = _key(email, otp)
+    pk = _cache().get(key)
+    if pk is not None:
+        _cache().delete(key)
+        return VERIFIED if _consume(pk) else INVALID
+
+    record = EmailOTP.objects.filter(email=email, otp=otp).order_by("-created_at").first()
+    if record is None:
+        return INVALID
+    if timezone.now() - record.created_at > _ttl():
+        return EXPIRED
+    return VERIFIED if _consume(record.pk) else INVALID
+
+
+async def _aconsume(pk):
+    deleted, _ = await EmailOTP.objects.filter(pk=pk).adelete()
+    return deleted > 0
+
+
+async def averify(email, otp):
+    """Async twin of ``verify`` for the ASGI path."""
+    outcome = await _averify(email, otp)
+    metrics.OTP_VERIFICATIONS.inc(outcome=outcome)
+    return outcome
+
+
+async def _averify(email, otp):
+    key = _key(email, otp)
+    pk = await _cache().aget(key)
+    if pk is not None:
+        await _cache().adelete(key)
+        return VERIFIED if await _aconsume(pk) else INVALID
+
+    record = await EmailOTP.objects.filter(email=email, otp=otp).order_by("-created_at").afirst()
+    if record is None:
+        return INVALID
+    if timezone.now() - record.created_at > _ttl():
+        return EXPIRED
+    return VERIFIED if await _aconsume(record.pk) else INVALID
+
+
+def purge_expired(batch_size=1000):
+    """Delete expired codes in batches; returns the number removed."""
+    cutoff = timezone.now() - _ttl()
+    removed = 0
+    while True:
+        batch = list(
+            EmailOTP.objects.filter(created_at__lt=cutoff).order_by("created_at").values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return removed
+        removed += EmailOTP.objects.filter(pk__in=batch).delete()[0]
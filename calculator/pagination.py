@@ -1,7 +1,147 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from rest_framework.pagination import PageNumberPagination
 
 class DynamicPageNumberPagination(PageNumberPagination):
     page_size = 8
-    page_size_query_param = 'page_size'  
-    max_page_size = 100  
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+# Filtered estimates stop counting here.
+ESTIMATE_CAP = 10000
+
+
+def estimated_count(queryset):
+    """Row count estimate whose cost does not grow with the table.
+
+    For an unfiltered queryset this is the primary-key span, read from the
+    two ends of the primary-key index; it overcounts by the number of
+    deleted rows. The ends are fetched separately because SQLite only
+    short-circuits a lone MIN or MAX. A filtered queryset is counted
+    exactly up to ``ESTIMATE_CAP`` rows and reported as ``ESTIMATE_CAP``
+    beyond that, so a broad filter costs at most that many index entries.
+    """
+    if queryset.query.where:
+        return queryset[:ESTIMATE_CAP].count()
+    pks = queryset.model.objects.values_list('pk', flat=True)
+    low = pks.order_by('pk').first()
+    if low is None:
+        return 0
+    return pks.order_by('-pk').first() - low + 1
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on (created_at, id).
+
+    Each page is a range read on the (created_at, id) index, so its cost does
+    not depend on how deep the page is. The opaque ``cursor`` parameter
+    carries the boundary row; ``count=exact`` or ``count=estimate`` (see
+    ``estimated_count``) adds a total, which is omitted by default.
+    """
+    page_size = 8
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def __init__(self, descending=True):
+        self.descending = descending
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, row, previous):
+        position = {'t': _value(row, 'created_at').isoformat(), 'i': _value(row, 'id'), 'p': int(previous)}
+        return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            created_at = parse_datetime(position['t'])
+            if created_at is None:
+                raise ValueError
+            return created_at, int(position['i']), bool(position['p'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        previous = bool(cursor and cursor[2])
+
+        # Walk towards older rows for a descending listing, unless paging back.
+        towards_lower = self.descending != previous
+        if towards_lower:
+            ordering, op = ('-created_at', '-id'), 'lt'
+        else:
+            ordering, op = ('created_at', 'id'), 'gt'
+
+        self.count = None
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = queryset.count()
+        elif count_mode == 'estimate':
+            self.count = estimated_count(queryset)
+
+        if cursor:
+            created_at, pk = cursor[0], cursor[1]
+            # The redundant bound on created_at alone lets the database seek
+            # the index instead of walking it from the start.
+            queryset = queryset.filter(
+                Q(**{f'created_at__{op}e': created_at}),
+                Q(**{f'created_at__{op}': created_at}) | Q(**{f'id__{op}': pk}),
+            )
+        rows = list(queryset.order_by(*ordering)[:size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size]
+        if previous:
+            rows.reverse()
+
+        self.next_cursor = self.previous_cursor = None
+        if rows:
+            if has_more or previous:
+                self.next_cursor = self.encode_cursor(rows[-1], previous=False)
+            if cursor and (has_more or not previous):
+                self.previous_cursor = self.encode_cursor(rows[0], previous=True)
+        return rows
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.previous_cursor)
+
+    def get_paginated_data(self, data):
+        payload = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count is not None:
+            payload['count'] = self.count
+        return payload
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+def _value(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
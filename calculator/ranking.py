@@ -0,0 +1,147 @@
+"""In-memory rank/percentile index over overall CGPAs, per department.
+
+Each department keeps a Fenwick (binary indexed) tree over CGPA buckets of
+0.01, so counting the students above a CGPA and moving a student between
+buckets are both O(log buckets). An index is warmed from CGPAAggregate on
+first use (or by ``warm_all`` at server startup) and updated after every
+committed save or delete.
+
+The index lives in each worker process, which only sees its own writes, so
+it is also rebuilt once it is older than ``RANK_INDEX_MAX_AGE`` seconds.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import CGPAAggregate
+
+logger = logging.getLogger(__name__)
+
+SCALE = 100
+BUCKETS = 10 * SCALE + 1
+
+
+class FenwickTree:
+    def __init__(self, counts):
+        """Build in O(n) from per-bucket counts."""
+        self.size = len(counts)
+        self.tree = [0] + [int(c) for c in counts]
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.total = int(sum(counts))
+
+    def add(self, index, delta):
+        self.total += delta
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        """Number of entries in buckets 0..index inclusive."""
+        total = 0
+        i = index + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+def bucket(cgpa):
+    return min(max(int(round(cgpa * SCALE)), 0), BUCKETS - 1)
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _max_age():
+    return getattr(settings, "RANK_INDEX_MAX_AGE", 300)
+
+
+def _build(department_id):
+    cgpas = np.fromiter(
+        (
+            points / credits
+            for points, credits in CGPAAggregate.objects.filter(department=department_id, total_credits__gt=0)
+            .values_list("total_grade_points", "total_credits")
+            .iterator(chunk_size=5000)
+        ),
+        dtype=np.float64,
+    )
+    buckets = np.clip(np.rint(cgpas * SCALE).astype(np.int64), 0, BUCKETS - 1)
+    return FenwickTree(np.bincount(buckets, minlength=BUCKETS)), time.monotonic()
+
+
+def _index(department_id):
+    with _lock:
+        entry = _indexes.get(department_id)
+    if entry is None or time.monotonic() - entry[1] > _max_age():
+        entry = _build(department_id)
+        with _lock:
+            _indexes[department_id] = entry
+    return entry[0]
+
+
+def warm_all():
+    departments = (
+        CGPAAggregate.objects.filter(department__isnull=False)
+        .values_list("department", flat=True)
+        .distinct()
+        .order_by()
+    )
+    for department_id in departments:
+        entry = _build(department_id)
+        with _lock:
+            _indexes[department_id] = entry
+
+
+def warm_on_startup():
+    """Warm every department from the WSGI/ASGI entry point; never blocks startup on a missing table."""
+    if not getattr(settings, "RANK_INDEX_WARM_ON_STARTUP", True):
+        return
+    try:
+        warm_all()
+    except DatabaseError:
+        logger.warning("Rank index not warmed; it will be built on first use.", exc_info=True)
+
+
+def record_change(department_id, old_cgpa, new_cgpa):
+    """Move one student between buckets; a no-op until the department is warmed."""
+    with _lock:
+        entry = _indexes.get(department_id)
+        if entry is None:
+            return
+        tree = entry[0]
+        if old_cgpa is not None:
+            tree.add(bucket(old_cgpa), -1)
+        if new_cgpa is not None:
+            tree.add(bucket(new_cgpa), 1)
+
+
+def invalidate(department_id=None):
+    with _lock:
+        if department_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(department_id, None)
+
+
+def rank(department_id, cgpa):
+    """Rank (1 = best, ties share a rank) and percentile of ``cgpa`` within the department."""
+    tree = _index(department_id)
+    with _lock:
+        position = bucket(cgpa)
+        at_or_below = tree.prefix_sum(position)
+        total = tree.total
+    return {
+        "rank": total - at_or_below + 1,
+        "total": total,
+        "percentile": round(100 * at_or_below / total, 2) if total else None,
+    }
@@ -0,0 +1,31 @@
+"""JSON rendering through orjson when it is installed.
+
+``FastJSONRenderer`` is a drop-in for DRF's ``JSONRenderer`` (registered in
+``REST_FRAMEWORK``). orjson encodes the plain dicts, lists and strings that
+the serializers produce several times faster than the stdlib; anything it
+does not know natively (``Decimal``, lazy translations, ...) goes through
+DRF's own encoder, so the output matches. Without orjson, or when a client
+asks for indented output, it is simply ``JSONRenderer``.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+_fallback = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data,
+            default=_fallback.default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+        # Escaped by JSONRenderer too: valid JSON, but not valid JavaScript.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,130 @@
+"""Synthetic catalog and results for benchmarking.
+
+Everything created here is recognisable (department codes start with
+``BENCH_CODE_PREFIX``, emails end with ``BENCH_EMAIL_DOMAIN``) so ``clear``
+can remove it without touching real data. Grades are drawn with NumPy a
+chunk of students at a time and written with the same upsert the importer
+uses, so seeding millions of UserResult rows runs in flat memory.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from . import aggregates, analytics, ranking
+from .grading import GRADE_POINTS
+from .models import CGPAAggregate, Department, Semester, Subject, UserResult
+
+BENCH_CODE_PREFIX = "BENCH"
+BENCH_EMAIL_DOMAIN = "bench.example"
+
+# Grade points drawn per subject; 0 is an arrear.
+POINT_CHOICES = np.array(sorted(GRADE_POINTS.values(), reverse=True) + [0], dtype=np.float64)
+POINT_WEIGHTS = np.array([0.12, 0.2, 0.22, 0.18, 0.12, 0.08, 0.08])
+
+
+def bench_email(index):
+    return f"student{index:07d}@{BENCH_EMAIL_DOMAIN}"
+
+
+def seed_catalog(departments, semesters, subjects, rng):
+    """Create the bench departments, semesters 1..N and their subjects; returns {dept_id: {sem: credits}}."""
+    for number in range(1, semesters + 1):
+        if not Semester.objects.filter(number=number).exists():
+            Semester.objects.create(number=number)
+    semester_ids = dict(Semester.objects.filter(number__lte=semesters).values_list("number", "id"))
+
+    credits = {}
+    for d in range(1, departments + 1):
+        department, _ = Department.objects.get_or_create(
+            code=f"{BENCH_CODE_PREFIX}{d:02d}", defaults={"name": f"Benchmark Department {d:02d}"}
+        )
+        Subject.objects.filter(department=department).delete()
+        rows = [
+            Subject(
+                code=f"B{d:02d}{s:02d}{k:02d}",
+                name=f"Benchmark Subject {s}.{k}",
+                credit=int(rng.integers(2, 5)),
+                semester_id=semester_ids[s],
+                department=department,
+            )
+            for s in range(1, semesters + 1)
+            for k in range(1, subjects + 1)
+        ]
+        Subject.objects.bulk_create(rows, batch_size=1000)
+        credits[department.id] = {
+            s: np.array([row.credit for row in rows if row.semester_id == semester_ids[s]], dtype=np.float64)
+            for s in range(1, semesters + 1)
+        }
+    return credits
+
+
+def _results(first, count, credits, results_per_student, rng):
+    department_ids = sorted(credits)
+    for offset in range(count):
+        index = first + offset
+        department_id = department_ids[index % len(department_ids)]
+        email = bench_email(index)
+        for semester in range(1, results_per_student + 1):
+            subject_credits = credits[department_id][semester]
+            points = rng.choice(POINT_CHOICES, size=subject_credits.size, p=POINT_WEIGHTS)
+            passed = points > 0
+            total_credits = int(subject_credits[passed].sum())
+            total_points = float((subject_credits * points).sum())
+            yield UserResult(
+                email=email,
+                department_id=department_id,
+                semester=semester,
+                cgpa=Decimal(f"{total_points / total_credits:.2f}") if total_credits else Decimal(0),
+                total_credits=total_credits,
+                total_grade_points=total_points,
+                arrear_count=int((~passed).sum()),
+            )
+
+
+def seed(departments=5, semesters=8, subjects=6, students=1000, results_per_student=4,
+         chunk_size=2000, random_seed=0, progress=None):
+    """Seed the bench catalog and ``students * results_per_student`` results.
+
+    ``progress`` is called with the number of results written after each
+    chunk. Returns the number of results written.
+    """
+    if min(departments, semesters, subjects, students, chunk_size) < 1:
+        raise ValueError("departments, semesters, subjects, students and chunk_size must be positive")
+    results_per_student = max(0, min(results_per_student, semesters))
+    rng = np.random.default_rng(random_seed)
+
+    with transaction.atomic():
+        credits = seed_catalog(departments, semesters, subjects, rng)
+
+    written = 0
+    students_per_chunk = max(1, chunk_size // max(results_per_student, 1))
+    for first in range(0, students if results_per_student else 0, students_per_chunk):
+        count = min(students_per_chunk, students - first)
+        rows = list(_results(first, count, credits, results_per_student, rng))
+        with transaction.atomic():
+            UserResult.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["email", "department", "semester"],
+                update_fields=["cgpa", "total_credits", "total_grade_points", "arrear_count", "created_at"],
+            )
+            aggregates.refresh({(row.email, row.department_id) for row in rows})
+        written += len(rows)
+        if progress:
+            progress(written)
+
+    analytics.rebuild_all()
+    ranking.invalidate()
+    return written
+
+
+def clear():
+    """Delete every bench department, subject, result and aggregate; returns the number of results removed."""
+    with transaction.atomic():
+        _, by_model = UserResult.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").delete()
+        CGPAAggregate.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").delete()
+        Department.objects.filter(code__startswith=BENCH_CODE_PREFIX).delete()
+    analytics.rebuild_all()
+    ranking.invalidate()
+    return by_model.get(UserResult._meta.label, 0)
@@ -1,11 +1,27 @@
+from decimal import ROUND_HALF_UP, Decimal
+from functools import cached_property
+
 from rest_framework import serializers
 from .models import UserResult,Semester,Subject,Department,EmailOTP
 
 
+class RoundedDecimalField(serializers.DecimalField):
+    """Rounds input to ``decimal_places`` instead of rejecting extra digits."""
+
+    def validate_precision(self, value):
+        step = Decimal(1).scaleb(-self.decimal_places)
+        return super().validate_precision(value.quantize(step, rounding=self.rounding or ROUND_HALF_UP))
+
+
 class UserSerializer(serializers.ModelSerializer):
+    cgpa = RoundedDecimalField(max_digits=4, decimal_places=2, min_value=0, max_value=10)
+
     class Meta:
         model = UserResult
         fields = '__all__'
+        # save_results replaces an existing (email, department, semester) row,
+        # so the unique constraint is left to the database.
+        validators = []
 
 
 class EmailSerializer(serializers.ModelSerializer):
@@ -31,3 +47,117 @@ class DepartmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Department
         fields = ['id', 'name', 'code']  
+
+
+class SubjectGradeSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=10)
+    status = serializers.ChoiceField(choices=["PASS", "ARREAR"])
+    grade = serializers.ChoiceField(choices=["O", "A+", "A", "B+", "B", "C"], required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs["status"] == "PASS" and not attrs.get("grade"):
+            raise serializers.ValidationError({"grade": "A grade is required for a passed subject."})
+        return attrs
+
+
+class StudentGradesSerializer(serializers.Serializer):
+    email = serializers.EmailField(required=False)
+    subjects = SubjectGradeSerializer(many=True, allow_empty=False)
+
+    def validate_subjects(self, value):
+        codes = [entry["code"] for entry in value]
+        if len(codes) != len(set(codes)):
+            raise serializers.ValidationError("Each subject may only be graded once.")
+        return value
+
+
+class ValuesSerializer:
+    """Read-only list output of a ModelSerializer, built from ``.values()`` rows.
+
+    ``serialize(rows)`` returns what ``serializer_class(instances,
+    many=True).data`` would, without creating model instances or binding
+    fields per row: only decimals, datetimes and other non-JSON values go
+    through the field's ``to_representation``; the rest pass straight through.
+    """
+
+    PASSTHROUGH = (
+        serializers.BooleanField, serializers.CharField, serializers.FloatField,
+        serializers.IntegerField, serializers.PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def _fields(self):
+        return [field for field in self.serializer_class().fields.values() if not field.write_only]
+
+    @cached_property
+    def field_names(self):
+        return [field.field_name for field in self._fields]
+
+    @cached_property
+    def _converters(self):
+        return [
+            (field.field_name, field.to_representation)
+            for field in self._fields if not isinstance(field, self.PASSTHROUGH)
+        ]
+
+    def values(self, queryset):
+        return queryset.values(*self.field_names)
+
+    def serialize(self, rows):
+        converters = self._converters
+        data = []
+        for row in rows:
+            for name, convert in converters:
+                value = row[name]
+                if value is not None:
+                    row[name] = convert(value)
+            data.append(row)
+        return data
+
+
+USER_RESULT_VALUES = ValuesSerializer(UserSerializer)
+SUBJECT_VALUES = ValuesSerializer(SubjectSerializer)
+DEPARTMENT_VALUES = ValuesSerializer(DepartmentSerializer)
+
+
+class GPARequestSerializer(serializers.Serializer):
+    department = serializers.PrimaryKeyRelatedField(queryset=Department.objects.all())
+    semester = serializers.IntegerField(min_value=1)
+    subjects = SubjectGradeSerializer(many=True, required=False, allow_empty=False)
+    students = StudentGradesSerializer(many=True, required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        if ("subjects" in attrs) == ("students" in attrs):
+            raise serializers.ValidationError("Provide either 'subjects' or 'students'.")
+        if "subjects" in attrs:
+            StudentGradesSerializer().validate_subjects(attrs["subjects"])
+        return attrs
+
+
+class ResultImportSerializer(serializers.Serializer):
+    """One row of a bulk result import; ``department`` is a department code.
+
+    Expects ``context["departments"]`` to map codes to ids so rows validate
+    without a query each.
+    """
+    email = serializers.EmailField()
+    department = serializers.CharField()
+    semester = serializers.IntegerField(min_value=1)
+    cgpa = serializers.FloatField(min_value=0, max_value=10)
+    total_credits = serializers.IntegerField(min_value=0)
+    total_grade_points = serializers.FloatField(min_value=0)
+    arrear_count = serializers.IntegerField(min_value=0, default=0)
+
+    def validate_department(self, value):
+        try:
+            return self.context["departments"][value]
+        except KeyError:
+            raise serializers.ValidationError(f"Unknown department code {value!r}.")
+
+    def validate(self, attrs):
+        attrs["department_id"] = attrs.pop("department")
+        attrs["cgpa"] = Decimal(f"{attrs['cgpa']:.2f}")
+        return attrs
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import catalog
+from .models import Department, Semester, Subject
+
+
+def invalidate_catalog_cache(sender, **kwargs):
+    transaction.on_commit(catalog.invalidate_catalog)
+
+
+for model in (Department, Semester, Subject):
+    post_save.connect(invalidate_catalog_cache, sender=model, dispatch_uid=f"catalog_save_{model.__name__}")
+    post_delete.connect(invalidate_catalog_cache, sender=model, dispatch_uid=f"catalog_delete_{model.__name__}")
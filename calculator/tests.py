@@ -1,3 +1,1113 @@
-from django.test import TestCase
+import base64
+import gzip
+import io
+import json
+import os
+import re
+import tempfile
+from contextvars import Context
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Q
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import aggregates, analytics, async_views, benchmarking, db_router, exporter, mail_queue, metrics, otp_store, ranking, seeding, throttling
+from .filters import filter_results
+from .importer import import_results
+from .models import (
+    CGPAAggregate, Department, EmailOTP, OutboundEmail, ResultSummary, Semester, Subject, UserResult,
+)
+from .renderers import FastJSONRenderer
+from .serializers import (
+    DEPARTMENT_VALUES, SUBJECT_VALUES, USER_RESULT_VALUES, DepartmentSerializer, SubjectSerializer, UserSerializer,
+)
+from .urls import build_urlpatterns, urlpatterns
+
+# Rows seeded per table; raise it locally (QUERY_PLAN_SEED_ROWS=1000000) to
+# reproduce production-sized plans.
+SEED_ROWS = int(os.environ.get("QUERY_PLAN_SEED_ROWS", 20000))
+
+FULL_SCAN = re.compile(r"\bSCAN (calculator_\w+)\b(?! USING)")
+
+
+class QueryPlanTests(TestCase):
+    """Every hot-path query must be answered from an index, not a table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.departments = Department.objects.bulk_create(
+            Department(name=f"Department {i}", code=f"D{i}") for i in range(10)
+        )
+        cls.semesters = Semester.objects.bulk_create(Semester(number=i) for i in range(1, 9))
+        Subject.objects.bulk_create(
+            Subject(code=f"S{i}", name=f"Subject {i}", credit=3,
+                    semester=cls.semesters[i % 8], department=cls.departments[i % 10])
+            for i in range(800)
+        )
+        now = timezone.now()
+        UserResult.objects.bulk_create(
+            (
+                UserResult(
+                    email=f"student{i // 8}@example.com",
+                    cgpa=f"{5 + i % 500 / 100:.2f}",
+                    semester=i % 8 + 1,
+                    department=cls.departments[(i // 8) % 10],
+                    total_credits=20,
+                    total_grade_points=160.0,
+                    created_at=now - timedelta(minutes=i),
+                )
+                for i in range(SEED_ROWS)
+            ),
+            batch_size=2000,
+        )
+        EmailOTP.objects.bulk_create(
+            (EmailOTP(email=f"student{i}@example.com", otp=f"{100000 + i % 900000}") for i in range(SEED_ROWS)),
+            batch_size=2000,
+        )
+        CGPAAggregate.objects.bulk_create(
+            (CGPAAggregate(email=f"student{i}@example.com", department=cls.departments[i % 10],
+                           total_credits=160, semester_count=8, total_grade_points=1280.0)
+             for i in range(SEED_ROWS // 8)),
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertIndexed(self, queryset):
+        plan = queryset.explain()
+        scans = FULL_SCAN.findall(plan)
+        self.assertFalse(scans, f"Full table scan on {scans}:\n{plan}")
+
+    def test_user_history(self):
+        department = self.departments[3]
+        self.assertIndexed(
+            UserResult.objects.filter(email="student3@example.com", department=department).order_by("created_at")
+        )
+
+    def test_save_and_delete_result(self):
+        self.assertIndexed(
+            UserResult.objects.filter(email="student3@example.com", department=self.departments[3], semester=2)
+        )
+
+    def test_overall_cgpa(self):
+        self.assertIndexed(CGPAAggregate.objects.filter(email="student3@example.com", department=self.departments[3]))
+
+    def test_admin_all_results(self):
+        self.assertIndexed(UserResult.objects.all().order_by("-created_at")[:5])
+
+    def test_admin_all_results_cursor_page(self):
+        boundary = UserResult.objects.order_by("-created_at", "-id")[SEED_ROWS // 2]
+        page = UserResult.objects.filter(
+            Q(created_at__lte=boundary.created_at),
+            Q(created_at__lt=boundary.created_at) | Q(id__lt=boundary.id),
+        ).order_by("-created_at", "-id")[:6]
+        self.assertIndexed(page)
+        # A deep page must seek into the index, not walk it from the top.
+        self.assertIn("SEARCH calculator_userresult USING INDEX userresult_created_id_idx", page.explain())
+
+    def test_department_cgpa_range(self):
+        leaderboard = UserResult.objects.filter(department=self.departments[4], cgpa__gte="8.5").order_by("-cgpa")[:10]
+        self.assertIndexed(leaderboard)
+        self.assertIn("USING INDEX userresult_dept_cgpa_idx", leaderboard.explain())
+
+    def test_admin_result_filters(self):
+        newest_first = ("-created_at", "-id")
+        searches = [
+            {"department": "D4"},
+            {"department": "D4", "semester": "3"},
+            {"department": "D4", "min_cgpa": "9.5"},
+            {"min_cgpa": "9.9"},
+            {"email": "student42@example.com"},
+            {"email_prefix": "student42"},
+            {"since": "2020-01-01", "until": "2020-01-02"},
+        ]
+        for params in searches:
+            with self.subTest(**params):
+                self.assertIndexed(filter_results(UserResult.objects.all(), params).order_by(*newest_first)[:6])
+
+    def test_verify_otp(self):
+        self.assertIndexed(EmailOTP.objects.filter(email="student3@example.com", otp="100003").order_by("-created_at")[:1])
+
+    def test_subjects_by_semester_and_department(self):
+        self.assertIndexed(Subject.objects.filter(semester=self.semesters[1], department=self.departments[2]))
+
+
+class SaveResultTests(TestCase):
+    def test_saving_a_semester_again_replaces_it(self):
+        department = Department.objects.create(name="Computer Science", code="CSE")
+        payload = {"email": "student@example.com", "department": department.pk, "semester": 1,
+                   "cgpa": "8.0", "total_credits": 20, "total_grade_points": 160.0}
+        first = self.client.post("/api/save-result/", payload, content_type="application/json")
+        self.assertEqual(first.status_code, 201, first.content)
+        second = self.client.post("/api/save-result/", {**payload, "cgpa": "9.0", "total_grade_points": 180.0},
+                                  content_type="application/json")
+        self.assertEqual(second.status_code, 201, second.content)
+        saved = UserResult.objects.filter(email="student@example.com").values_list("cgpa", flat=True)
+        self.assertEqual([float(cgpa) for cgpa in saved], [9.0])
+
+
+class CurriculumTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name="Computer Science", code="CSE")
+        other = Department.objects.create(name="Mechanical", code="MECH")
+        first, second = Semester.objects.create(number=1), Semester.objects.create(number=2)
+        Subject.objects.create(code="CS101", name="Programming", credit=4, semester=first, department=self.department)
+        Subject.objects.create(code="CS102", name="Mathematics", credit=3, semester=first, department=self.department)
+        Subject.objects.create(code="CS201", name="Data Structures", credit=4, semester=second, department=self.department)
+        Subject.objects.create(code="ME101", name="Mechanics", credit=4, semester=first, department=other)
+
+    def test_nested_payload_in_four_queries_then_from_cache(self):
+        # The department list (cached for the ETag check) plus the curriculum itself.
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/curriculum/CSE/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "department": {"id": self.department.pk, "name": "Computer Science", "code": "CSE"},
+            "semesters": [
+                {"number": 1, "subjects": [{"code": "CS101", "name": "Programming", "credit": 4},
+                                           {"code": "CS102", "name": "Mathematics", "credit": 3}]},
+                {"number": 2, "subjects": [{"code": "CS201", "name": "Data Structures", "credit": 4}]},
+            ],
+        })
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/curriculum/CSE/").json(), response.json())
+
+    def test_unknown_department_is_not_found(self):
+        response = self.client.get("/api/curriculum/NOPE/")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"error": "Department not found"})
+
+    def test_subject_changes_invalidate_the_cache(self):
+        self.client.get("/api/curriculum/CSE/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.get(code="CS101").delete()
+        subjects = self.client.get("/api/curriculum/CSE/").json()["semesters"][0]["subjects"]
+        self.assertEqual(subjects, [{"code": "CS102", "name": "Mathematics", "credit": 3}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            subject = Subject.objects.get(code="CS102")
+            subject.credit = 0
+            subject.save()
+        subjects = self.client.get("/api/curriculum/CSE/").json()["semesters"][0]["subjects"]
+        self.assertEqual(subjects, [{"code": "CS102", "name": "Mathematics", "credit": 0}])
+
+
+class GradingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Computer Science", code="CSE")
+        semester = Semester.objects.create(number=1)
+        for code, credit in [("CS101", 4), ("CS102", 3), ("CS103", 0), ("CS104", 2)]:
+            Subject.objects.create(code=code, name=code, credit=credit, semester=semester, department=cls.department)
+
+    def compute(self, subjects):
+        response = self.client.post("/api/compute-gpa/", {
+            "department": self.department.pk, "semester": 1, "subjects": subjects,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_all_pass_semester_is_credit_weighted(self):
+        # (10*4 + 8*3 + 6*2) / (4 + 3 + 2) = 76 / 9
+        result = self.compute([
+            {"code": "CS101", "status": "PASS", "grade": "O"},
+            {"code": "CS102", "status": "PASS", "grade": "A"},
+            {"code": "CS104", "status": "PASS", "grade": "B"},
+        ])
+        self.assertEqual(result, {"total_credits": 9, "total_grade_points": 76.0, "arrear_count": 0, "gpa": 8.44})
+
+    def test_arrears_earn_no_credits(self):
+        # (9*4 + 7*2) / (4 + 2) = 50 / 6; CS102's credits are left out.
+        result = self.compute([
+            {"code": "CS101", "status": "PASS", "grade": "A+"},
+            {"code": "CS102", "status": "ARREAR"},
+            {"code": "CS104", "status": "PASS", "grade": "B+"},
+        ])
+        self.assertEqual(result, {"total_credits": 6, "total_grade_points": 50.0, "arrear_count": 1, "gpa": 8.33})
+
+        only_arrears = self.compute([{"code": "CS101", "status": "ARREAR"}])
+        self.assertEqual(only_arrears, {"total_credits": 0, "total_grade_points": 0.0, "arrear_count": 1, "gpa": None})
+
+    def test_zero_credit_subjects_do_not_move_the_gpa(self):
+        result = self.compute([
+            {"code": "CS101", "status": "PASS", "grade": "B"},
+            {"code": "CS103", "status": "PASS", "grade": "O"},
+        ])
+        self.assertEqual(result, {"total_credits": 4, "total_grade_points": 24.0, "arrear_count": 0, "gpa": 6.0})
+
+        self.assertEqual(self.compute([{"code": "CS103", "status": "PASS", "grade": "O"}])["gpa"], None)
+        self.assertEqual(self.compute([{"code": "CS103", "status": "ARREAR"}])["arrear_count"], 1)
+
+    def test_batch_matches_single_semester(self):
+        students = [
+            {"email": "a@example.com", "subjects": [{"code": "CS101", "status": "PASS", "grade": "O"}]},
+            {"email": "b@example.com", "subjects": [{"code": "CS102", "status": "ARREAR"},
+                                                    {"code": "CS104", "status": "PASS", "grade": "C"}]},
+        ]
+        response = self.client.post("/api/compute-gpa/", {
+            "department": self.department.pk, "semester": 1, "students": students,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 200, response.content)
+        for student, result in zip(students, response.json()["results"]):
+            self.assertEqual(result, {"email": student["email"], **self.compute(student["subjects"])})
+
+    def test_unknown_subject_is_rejected(self):
+        response = self.client.post("/api/compute-gpa/", {
+            "department": self.department.pk, "semester": 1,
+            "subjects": [{"code": "XX999", "status": "PASS", "grade": "O"}],
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("XX999", response.json()["error"])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name="Computer Science", code="CSE")
+        UserResult.objects.bulk_create(
+            UserResult(email="student@example.com", department=self.department, semester=i, cgpa="8.00")
+            for i in range(1, 14)
+        )
+        # Four rows per timestamp, so page boundaries fall inside ties.
+        start = timezone.now()
+        for index, pk in enumerate(UserResult.objects.order_by("id").values_list("id", flat=True)):
+            UserResult.objects.filter(pk=pk).update(created_at=start + timedelta(seconds=index // 4))
+
+    def walk(self, url, params, key):
+        """Follow next links to the end, then previous links back; returns the ids seen each way."""
+        page = self.client.get(url, {**params, "pagination": "cursor", "page_size": 3}).json()
+        forward = [[row["id"] for row in page[key]]]
+        while page["next"]:
+            page = self.client.get(page["next"]).json()
+            forward.append([row["id"] for row in page[key]])
+        backward = [forward[-1]]
+        while page["previous"]:
+            page = self.client.get(page["previous"]).json()
+            backward.append([row["id"] for row in page[key]])
+        return forward, backward[::-1]
+
+    def test_admin_results_page_both_ways_without_gaps_or_repeats(self):
+        expected = list(UserResult.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        forward, backward = self.walk("/api/admin-results/", {}, "results")
+        self.assertEqual([pk for page in forward for pk in page], expected)
+        self.assertEqual(backward, forward)
+        self.assertEqual([len(page) for page in forward], [3, 3, 3, 3, 1])
+
+    def test_history_pages_oldest_first(self):
+        expected = list(UserResult.objects.order_by("created_at", "id").values_list("id", flat=True))
+        forward, backward = self.walk("/api/user-history/", {"email": "student@example.com", "dept_id": self.department.pk}, "history")
+        self.assertEqual([pk for page in forward for pk in page], expected)
+        self.assertEqual(backward, forward)
+
+    def test_estimated_count_is_capped_for_filtered_queries(self):
+        params = {"pagination": "cursor", "count": "estimate"}
+        self.assertEqual(self.client.get("/api/admin-results/", params).json()["count"], 13)
+        filtered = {**params, "department": "CSE"}
+        self.assertEqual(self.client.get("/api/admin-results/", filtered).json()["count"], 13)
+        with mock.patch("calculator.pagination.ESTIMATE_CAP", 5):
+            self.assertEqual(self.client.get("/api/admin-results/", filtered).json()["count"], 5)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get("/api/user-history/", {**params, "email": "student@example.com",
+                                                       "dept_id": self.department.pk})
+            self.assertTrue(any("LIMIT 5" in query["sql"] for query in queries))
+
+    def test_bad_cursor_is_not_found(self):
+        for cursor in ["not-base64!", "e30=", base64.urlsafe_b64encode(b'{"t":"yesterday","i":1,"p":0}').decode()]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/admin-results/", {"pagination": "cursor", "cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class CGPAAggregateTests(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name="Computer Science", code="CSE")
+
+    def save_result(self, email, semester, credits, grade_points):
+        response = self.client.post("/api/save-result/", {
+            "email": email, "department": self.department.pk, "semester": semester,
+            "cgpa": f"{grade_points / credits:.2f}", "total_credits": credits, "total_grade_points": grade_points,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def stored(self):
+        return {
+            (a.email, a.department_id): (a.total_credits, a.total_grade_points, a.semester_count)
+            for a in CGPAAggregate.objects.exclude(semester_count=0)
+        }
+
+    def version(self, email):
+        return CGPAAggregate.objects.get(email=email, department=self.department).version
+
+    def test_incremental_totals_match_a_rebuild(self):
+        self.save_result("a@example.com", 1, 20, 160.0)
+        self.save_result("a@example.com", 2, 22, 187.0)
+        self.save_result("b@example.com", 1, 18, 126.0)
+        version = self.version("a@example.com")
+        self.save_result("a@example.com", 1, 21, 199.5)
+        self.assertGreater(self.version("a@example.com"), version)
+
+        version = self.version("a@example.com")
+        response = self.client.delete(f"/api/delete-result/?email=a@example.com&department={self.department.pk}&semester=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(self.version("a@example.com"), version)
+
+        self.assertEqual(self.stored(), aggregates.expected_aggregates())
+        self.assertEqual(self.stored()[("a@example.com", self.department.pk)], (21, 199.5, 1))
+        overall = self.client.get("/api/calculate-cgpa/", {"email": "a@example.com", "dept_id": self.department.pk})
+        self.assertEqual(overall.json(), {"cgpa": 9.5, "semester_count": 1})
+        call_command("rebuild_cgpa_aggregates", "--verify", stdout=io.StringIO())
+
+    def test_verify_reports_drift(self):
+        self.save_result("a@example.com", 1, 20, 160.0)
+        CGPAAggregate.objects.update(total_credits=10)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_cgpa_aggregates", "--verify", stdout=io.StringIO())
+        call_command("rebuild_cgpa_aggregates", stdout=io.StringIO())
+        call_command("rebuild_cgpa_aggregates", "--verify", stdout=io.StringIO())
+
+    def test_admin_edits_update_the_aggregates(self):
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.login(username="admin", password="password")
+        self.save_result("a@example.com", 1, 20, 160.0)
+        result = UserResult.objects.get()
+        response = self.client.post(f"/admin/calculator/userresult/{result.pk}/change/", {
+            "email": "a@example.com", "cgpa": "9.00", "semester": 1, "department": self.department.pk,
+            "total_credits": 20, "total_grade_points": 180.0, "arrear_count": 0,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.stored(), aggregates.expected_aggregates())
+        self.assertEqual(ResultSummary.objects.get().count, 1)
+
+        response = self.client.post(f"/admin/calculator/userresult/{result.pk}/delete/", {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.stored(), {})
+        self.assertFalse(ResultSummary.objects.exists())
+
+
+class ImportResultsTests(TestCase):
+    HEADER = "email,department,semester,cgpa,total_credits,total_grade_points,arrear_count\n"
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Computer Science", code="CSE")
+
+    def import_csv(self, lines, **kwargs):
+        return import_results(io.StringIO(self.HEADER + "".join(lines)), "csv", **kwargs)
+
+    def test_reimport_upserts_and_reports_rejected_rows(self):
+        report = self.import_csv([
+            "a@example.com,CSE,1,8.00,20,160,0\n",
+            "b@example.com,CSE,1,7.00,20,140,1\n",
+        ])
+        self.assertEqual((report.rows, report.imported, report.rejected), (2, 2, 0))
+
+        report = self.import_csv([
+            "a@example.com,CSE,1,9.00,20,180,0\n",
+            "c@example.com,MECH,1,7.00,20,140,0\n",
+            "d@example.com,CSE,one,7.00,20,140,0\n",
+        ])
+        self.assertEqual((report.rows, report.imported, report.rejected), (3, 1, 2))
+        self.assertEqual([error["line"] for error in report.errors], [3, 4])
+        self.assertIn("department", report.errors[0]["error"])
+        self.assertIn("semester", report.errors[1]["error"])
+
+        saved = dict(UserResult.objects.values_list("email", "cgpa"))
+        self.assertEqual(saved, {"a@example.com": Decimal("9.00"), "b@example.com": Decimal("7.00")})
+        aggregate = CGPAAggregate.objects.get(email="a@example.com")
+        self.assertEqual((aggregate.total_grade_points, aggregate.semester_count), (180.0, 1))
+        self.assertTrue(ResultSummary.objects.get(department=self.department, semester=1).stale)
+
+    def test_committed_chunks_are_marked_stale_when_a_later_chunk_fails(self):
+        refresh = aggregates.refresh
+        calls = []
+
+        def fail_second_chunk(keys):
+            calls.append(keys)
+            if len(calls) == 2:
+                raise RuntimeError("killed")
+            refresh(keys)
+
+        with mock.patch.object(aggregates, "refresh", side_effect=fail_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.import_csv(["a@example.com,CSE,1,8.00,20,160,0\n", "b@example.com,CSE,2,8.00,20,160,0\n"],
+                                chunk_size=1)
+        self.assertEqual(list(UserResult.objects.values_list("semester", flat=True)), [1])
+        self.assertEqual(list(ResultSummary.objects.filter(stale=True).values_list("semester", flat=True)), [1])
+
+
+class ExportResultsTests(TestCase):
+    def setUp(self):
+        department = Department.objects.create(name="Computer Science", code="CSE")
+        UserResult.objects.create(email="a@example.com", department=department, semester=1, cgpa="8.50",
+                                  total_credits=20, total_grade_points=170.0)
+        UserResult.objects.create(email="b@example.com", department=department, semester=2, cgpa="7.25",
+                                  total_credits=16, total_grade_points=116.0, arrear_count=1)
+        UserResult.objects.create(email="c@example.com", department=None, semester=1, cgpa=None)
+        self.created = [row.isoformat() for row in UserResult.objects.order_by("id").values_list("created_at", flat=True)]
+        self.admin = User.objects.create_user("admin", is_staff=True)
+
+    def export(self, **params):
+        self.client.force_login(self.admin)
+        return self.client.get("/api/admin/export-results/", params)
+
+    def test_csv(self):
+        response = self.export()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="results.csv"')
+        self.assertEqual(b"".join(response.streaming_content).decode().splitlines(), [
+            "email,department,semester,cgpa,total_credits,total_grade_points,arrear_count,created_at",
+            f"a@example.com,CSE,1,8.50,20,170.0,0,{self.created[0]}",
+            f"b@example.com,CSE,2,7.25,16,116.0,1,{self.created[1]}",
+            f"c@example.com,,1,,0,0.0,0,{self.created[2]}",
+        ])
+
+    def test_ndjson_with_filters(self):
+        response = self.export(export_format="ndjson", department="CSE", min_cgpa="8")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows, [{
+            "email": "a@example.com", "department": "CSE", "semester": 1, "cgpa": 8.5, "total_credits": 20,
+            "total_grade_points": 170.0, "arrear_count": 0, "created_at": self.created[0],
+        }])
+
+    def test_admin_only(self):
+        self.assertEqual(self.client.get("/api/admin/export-results/").status_code, 403)
+        student = User.objects.create_user("student")
+        self.client.force_login(student)
+        self.assertEqual(self.client.get("/api/admin/export-results/").status_code, 403)
+
+    def test_bad_format_and_filter(self):
+        response = self.export(export_format="xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("csv, ndjson", response.json()["error"])
+        self.assertEqual(self.export(semester="first").status_code, 400)
+
+    def test_rows_are_streamed_in_chunks(self):
+        self.assertTrue(self.export().streaming)
+        with self.assertNumQueries(0):
+            chunks = exporter.export_results(fmt="ndjson", chunk_size=1)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(chunks)), 3)
+        self.assertEqual(len(list(exporter.export_results(fmt="csv", chunk_size=2))), 2)
+
+    def test_command_writes_the_same_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.csv")
+            call_command("export_results", "-o", path, "--department", "CSE", stderr=io.StringIO())
+            with open(path, encoding="utf-8") as exported:
+                lines = exported.read().splitlines()
+        self.assertEqual(lines, b"".join(self.export(department="CSE").streaming_content).decode().splitlines())
+        with self.assertRaises(CommandError):
+            call_command("export_results", "--semester", "0", "--since", "yesterday", stdout=io.StringIO())
+
+
+@override_settings(RESULT_SUMMARIES={**settings.RESULT_SUMMARIES, "INLINE_WORKER": False})
+class ResultSummaryTests(TestCase):
+    FIELDS = ["count", "pass_count", "mean", "median", "minimum", "maximum", "percentiles", "histogram"]
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Computer Science", code="CSE")
+        UserResult.objects.bulk_create(
+            UserResult(email=f"student{i}@example.com", department=self.department, semester=1,
+                       cgpa=f"{5 + i % 50 / 10:.2f}", arrear_count=i % 3, total_credits=20, total_grade_points=100.0)
+            for i in range(200)
+        )
+        analytics.rebuild_all()
+
+    def save_result(self, email, cgpa, arrear_count=0):
+        response = self.client.post("/api/save-result/", {
+            "email": email, "department": self.department.pk, "semester": 1, "cgpa": cgpa,
+            "arrear_count": arrear_count, "total_credits": 20, "total_grade_points": 160.0,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def summary(self):
+        return ResultSummary.objects.values(*self.FIELDS, "stale").get(department=self.department, semester=1)
+
+    def test_writes_update_the_summary_in_place_and_refresh_recomputes_the_rest(self):
+        # The write path reads only the student's own rows, never the whole group.
+        with CaptureQueriesContext(connection) as queries:
+            self.save_result("student1@example.com", "9.95")
+        reads = [q["sql"] for q in queries if q["sql"].startswith("SELECT") and 'FROM "calculator_userresult"' in q["sql"]]
+        self.assertTrue(reads)
+        for sql in reads:
+            self.assertIn('"calculator_userresult"."email" =', sql)
+        self.save_result("new@example.com", "4.00", arrear_count=1)
+        response = self.client.delete(f"/api/delete-result/?email=student2@example.com&department={self.department.pk}&semester=1")
+        self.assertEqual(response.status_code, 200)
+
+        updated = self.summary()
+        self.assertTrue(updated["stale"])
+        payload = self.client.get("/api/analytics/summary/", {"dept_id": self.department.pk}).json()
+        self.assertTrue(payload["summaries"][0]["stale"])
+        analytics.refresh_group(self.department.pk, 1)
+        refreshed = self.summary()
+        self.assertFalse(refreshed["stale"])
+        for field in ["count", "pass_count", "histogram", "maximum"]:
+            self.assertEqual(updated[field], refreshed[field], field)
+        self.assertAlmostEqual(updated["mean"], refreshed["mean"], places=3)
+        self.assertEqual(refreshed["minimum"], 4.0)
+
+        self.assertEqual(analytics.refresh_stale(), 0)
+
+    def test_a_missing_summary_is_built_from_the_whole_group(self):
+        ResultSummary.objects.all().delete()
+        self.save_result("student1@example.com", "9.95")
+        summary = self.summary()
+        self.assertEqual(summary["count"], 200)
+        self.assertFalse(summary["stale"])
+        self.assertEqual(summary["maximum"], 9.95)
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        ranking.invalidate()
+        self.addCleanup(ranking.invalidate)
+
+    def test_fenwick_prefix_sums_match_a_brute_force_count(self):
+        rng = np.random.default_rng(7)
+        counts = rng.integers(0, 5, size=ranking.BUCKETS)
+        tree = ranking.FenwickTree(counts)
+        for index, delta in zip(rng.integers(0, ranking.BUCKETS, size=200), rng.choice([-1, 1], size=200)):
+            if counts[index] + delta >= 0:
+                counts[index] += delta
+                tree.add(int(index), int(delta))
+        for index in [0, 1, 2, 499, 500, ranking.BUCKETS - 2, ranking.BUCKETS - 1, *rng.integers(0, ranking.BUCKETS, 50)]:
+            self.assertEqual(tree.prefix_sum(int(index)), counts[:index + 1].sum(), index)
+        self.assertEqual(tree.total, counts.sum())
+
+    def test_rank_matches_a_brute_force_count(self):
+        department = Department.objects.create(name="Computer Science", code="CSE")
+        cgpas = [10.0, 10.0, 9.5, 8.25, 8.25, 8.25, 7.0, 0.0, 0.0]
+        CGPAAggregate.objects.bulk_create(
+            CGPAAggregate(email=f"student{i}@example.com", department=department,
+                          total_credits=20, total_grade_points=cgpa * 20, semester_count=1)
+            for i, cgpa in enumerate(cgpas)
+        )
+        for cgpa in [*set(cgpas), 5.0, 9.99]:
+            with self.subTest(cgpa=cgpa):
+                at_or_below = sum(other <= cgpa for other in cgpas)
+                self.assertEqual(ranking.rank(department.pk, cgpa), {
+                    "rank": sum(other > cgpa for other in cgpas) + 1,
+                    "total": len(cgpas),
+                    "percentile": round(100 * at_or_below / len(cgpas), 2),
+                })
+        self.assertEqual(ranking.rank(department.pk, 10.0)["rank"], 1)
+        self.assertEqual(ranking.rank(department.pk, 0.0)["rank"], 8)
+
+        ranking.record_change(department.pk, 0.0, 10.0)
+        self.assertEqual(ranking.rank(department.pk, 10.0)["rank"], 1)
+        self.assertEqual(ranking.rank(department.pk, 9.5)["rank"], 4)
+        self.assertEqual(ranking.rank(department.pk, 0.0)["percentile"], round(100 / 9, 2))
+
+    def test_empty_department(self):
+        department = Department.objects.create(name="Computer Science", code="CSE")
+        self.assertEqual(ranking.rank(department.pk, 8.0), {"rank": 1, "total": 0, "percentile": None})
+
+
+class ValuesSerializerTests(TestCase):
+    def test_matches_model_serializer_output(self):
+        department = Department.objects.create(name="Computer Science", code="CSE")
+        semester = Semester.objects.create(number=1)
+        Subject.objects.create(code="CS101", name="Programming", credit=4, semester=semester, department=department)
+        UserResult.objects.create(email="a@example.com", cgpa="8.50", department=department, total_grade_points=170.5)
+        UserResult.objects.create(email="b@example.com", cgpa=None, department=None, semester=2)
+        cases = [
+            (USER_RESULT_VALUES, UserSerializer, UserResult.objects.order_by("id")),
+            (SUBJECT_VALUES, SubjectSerializer, Subject.objects.order_by("id")),
+            (DEPARTMENT_VALUES, DepartmentSerializer, Department.objects.order_by("id")),
+        ]
+        for fast, serializer_class, queryset in cases:
+            with self.subTest(serializer_class.__name__):
+                expected = json.loads(json.dumps(serializer_class(queryset, many=True).data))
+                self.assertEqual(fast.serialize(fast.values(queryset)), expected)
+
+
+class ResponseEncodingTests(TestCase):
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {
+            "results": [{"cgpa": Decimal("8.50"), "created_at": datetime(2025, 6, 1, 9, 30, 0, 123456, dt_timezone.utc)}],
+            "name": "Génie\u2028civil",
+            "count": 1,
+            "next": None,
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_large_responses_are_compressed(self):
+        department = Department.objects.create(name="Computer Science", code="CSE")
+        UserResult.objects.bulk_create(
+            UserResult(email=f"student{i}@example.com", cgpa="8.00", department=department) for i in range(50)
+        )
+        small = self.client.get("/api/semesters/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(small.has_header("Content-Encoding"))
+
+        response = self.client.get("/api/admin-results/", {"page_size": 50}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        page = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(page["results"]), 50)
+
+
+@override_settings(RESULT_SUMMARIES={**settings.RESULT_SUMMARIES, "INLINE_WORKER": False})
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name="Computer Science", code="CSE")
+        self.semester = Semester.objects.create(number=1)
+        Subject.objects.create(code="CS101", name="Programming", credit=4, semester=self.semester, department=self.department)
+
+    def save_result(self, email="a@example.com", grade="A"):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/save-result/", {
+                "email": email, "department": self.department.id, "semester": 1,
+                "subjects": [{"code": "CS101", "status": "PASS", "grade": grade}],
+            }, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+    def test_catalog_revalidates_until_the_catalog_changes(self):
+        first = self.client.get("/api/departments/")
+        etag = first["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/departments/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Department.objects.create(name="Mechanical", code="MECH")
+        changed = self.client.get("/api/departments/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(len(changed.json()["departments"]), 2)
+
+    def test_errors_are_not_tagged(self):
+        etag = self.client.get("/api/departments/")["ETag"]
+        for path in ["/api/subjects/9/CSE/", "/api/subjects/1/NOPE/", "/api/curriculum/NOPE/"]:
+            with self.subTest(path=path):
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 404)
+                self.assertFalse(response.has_header("ETag"))
+        self.assertEqual(self.client.get("/api/subjects/1/CSE/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.save_result()
+        params = {"email": "a@example.com", "dept_id": self.department.id}
+        self.assertTrue(self.client.get("/api/user-history/", params).has_header("ETag"))
+        for extra in [{"page": 9}, {"pagination": "cursor", "cursor": "bad"}]:
+            with self.subTest(params=extra):
+                response = self.client.get("/api/user-history/", {**params, **extra})
+                self.assertEqual(response.status_code, 404)
+                self.assertFalse(response.has_header("ETag"))
+
+    def test_history_revalidates_until_the_students_results_change(self):
+        params = {"email": "a@example.com", "dept_id": self.department.id}
+        self.save_result()
+        etag = self.client.get("/api/user-history/", params)["ETag"]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/user-history/", params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.save_result(email="b@example.com")
+        self.assertEqual(self.client.get("/api/user-history/", params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.save_result(grade="O")
+        response = self.client.get("/api/user-history/", params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["history"][0]["cgpa"], "10.00")
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("SMTP unavailable")
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+                   EMAIL_QUEUE={**settings.EMAIL_QUEUE, "INLINE_WORKER": False})
+class EmailQueueTests(TestCase):
+    def test_send_otp_only_enqueues(self):
+        response = self.client.post("/api/send-otp/", {"email": "student@example.com"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.recipient, "student@example.com")
+        self.assertIn(EmailOTP.objects.get().otp, queued.body)
+
+    def test_process_batch_sends_due_messages(self):
+        for i in range(3):
+            mail_queue.enqueue(f"student{i}@example.com", "Subject", "Body")
+
+        self.assertEqual(mail_queue.drain(), 3)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.SENT).exists())
+
+    @override_settings(EMAIL_BACKEND="calculator.tests.FailingEmailBackend", EMAIL_QUEUE={"MAX_ATTEMPTS": 2})
+    def test_failures_back_off_then_give_up(self):
+        email = mail_queue.enqueue("student@example.com", "Subject", "Body")
+
+        mail_queue.process_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.PENDING, 1))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(mail_queue.process_batch(), 0)
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        mail_queue.process_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.FAILED, 2))
+        self.assertIn("SMTP unavailable", email.last_error)
+
+    def test_concurrent_claimers_never_share_a_message(self):
+        for i in range(4):
+            mail_queue.enqueue(f"student{i}@example.com", "Subject", "Body")
+        due_ids = mail_queue._due_ids
+        other = []
+
+        def race(now, batch_size):
+            # Both workers see all four rows due; the other one claims two of
+            # them before this one's UPDATE runs.
+            ids = due_ids(now, batch_size)
+            other.extend(mail_queue.claim_batch(2))
+            return ids
+
+        calls = iter([race, due_ids])
+        with mock.patch.object(mail_queue, "_due_ids", side_effect=lambda *args: next(calls)(*args)):
+            mine = mail_queue.claim_batch(10)
+
+        self.assertEqual(len(other), 2)
+        self.assertEqual(len(mine), 2)
+        self.assertEqual({email.pk for email in mine} | {email.pk for email in other},
+                         set(OutboundEmail.objects.values_list("pk", flat=True)))
+        self.assertEqual(mail_queue.process_batch(), 0)
+
+
+class OTPStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def issue(self, email="student@example.com"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return otp_store.issue(email)
+
+    def test_code_verifies_once_from_cache(self):
+        otp = self.issue()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(otp_store.verify("student@example.com", otp), otp_store.VERIFIED)
+        self.assertEqual(otp_store.verify("student@example.com", otp), otp_store.INVALID)
+
+    def test_cache_miss_falls_back_to_database(self):
+        otp = self.issue()
+        cache.clear()
+
+        self.assertEqual(otp_store.verify("student@example.com", otp), otp_store.VERIFIED)
+        self.assertFalse(EmailOTP.objects.exists())
+
+    def test_expired_codes_are_rejected_and_purged(self):
+        otp = self.issue()
+        cache.clear()
+        EmailOTP.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        self.issue("other@example.com")
+
+        self.assertEqual(otp_store.verify("student@example.com", otp), otp_store.EXPIRED)
+        self.assertEqual(otp_store.purge_expired(batch_size=1), 1)
+        self.assertEqual(list(EmailOTP.objects.values_list("email", flat=True)), ["other@example.com"])
+
+
+class BenchmarkSuiteTests(TestCase):
+    """The endpoint benchmark must keep covering every route and every call must succeed."""
+
+    def test_every_route_is_benchmarked(self):
+        self.assertEqual(benchmarking.uncovered_routes(urlpatterns), [])
+
+    def test_bench_endpoints_writes_a_clean_baseline(self):
+        seeding.seed(departments=2, semesters=2, subjects=3, students=20, results_per_student=2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            call_command("bench_endpoints", requests=2, warmup=0, baseline=path, save_baseline=True, stdout=io.StringIO())
+            with open(path) as f:
+                results = json.load(f)["endpoints"]
+
+        self.assertEqual(set(results), {endpoint.label for endpoint in benchmarking.ENDPOINTS})
+        self.assertEqual({label: stats["errors"] for label, stats in results.items() if stats["errors"]}, {})
+        self.assertEqual(UserResult.objects.count(), 40)
+
+
+class MetricsTests(TestCase):
+    def test_requests_are_recorded_per_route(self):
+        Department.objects.create(name="Computer Science", code="CSE")
+        self.client.get("/api/departments/")
+
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn('cgpa_http_requests_total{route="api/departments/",method="GET",status="200"}', body)
+        self.assertIn('cgpa_db_queries_per_request_count{route="api/departments/"}', body)
+        self.assertNotIn('route="metrics"', body)
+
+    @override_settings(METRICS_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get("/api/semesters/")
+
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+
+    def test_queries_on_every_database_alias_are_counted(self):
+        # A second connection to the test database stands in for the replica.
+        replica = connections.create_connection(DEFAULT_DB_ALIAS)
+        self.addCleanup(replica.close)
+        with mock.patch.object(metrics.connections, "all", return_value=[connection, replica]):
+            with metrics.counting(metrics.QueryCounter()) as counter:
+                Department.objects.count()
+                with replica.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM calculator_department")
+
+        self.assertEqual(counter.queries, 2)
+
+    def test_otp_outcomes_are_counted(self):
+        before = dict(metrics.OTP_VERIFICATIONS.values)
+        otp_store.verify("student@example.com", "000000")
+
+        self.assertEqual(metrics.OTP_VERIFICATIONS.values[("invalid",)], before.get(("invalid",), 0) + 1)
+
+
+THROTTLE_RATES = {"otp_send_ip": "4/hour", "otp_send_email": "2/hour", "otp_verify_ip": "100/hour", "otp_verify_email": "3/minute"}
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": THROTTLE_RATES})
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def send_otp(self, email, **extra):
+        # Not the front end's address, so REMOTE_ADDR is the client.
+        extra.setdefault("REMOTE_ADDR", "198.51.100.7")
+        return self.client.post("/api/send-otp/", {"email": email}, content_type="application/json", **extra)
+
+    def test_send_otp_is_limited_per_email_then_per_ip(self):
+        before = metrics.THROTTLE_DECISIONS.values.get(("otp_send_email", "throttled"), 0)
+        self.assertEqual(self.send_otp("a@example.com").status_code, 200)
+        self.assertEqual(self.send_otp("A@example.com ").status_code, 200)
+
+        with self.assertNumQueries(0):
+            rejected = self.send_otp("a@example.com")
+        self.assertEqual(rejected.status_code, 429)
+        self.assertEqual(int(rejected["Retry-After"]), 30 * 60)
+        self.assertEqual(EmailOTP.objects.count(), 2)
+        self.assertEqual(metrics.THROTTLE_DECISIONS.values[("otp_send_email", "throttled")], before + 1)
+
+        # Every check takes a token, so the rejected request spent the IP's third.
+        self.assertEqual(self.send_otp("b@example.com").status_code, 200)
+        self.assertEqual(self.send_otp("c@example.com").status_code, 429)
+
+    def test_forged_forwarded_for_does_not_reset_the_ip_bucket(self):
+        statuses = [
+            self.send_otp(f"student{i}@example.com", HTTP_X_FORWARDED_FOR=f"203.0.113.{i}").status_code
+            for i in range(5)
+        ]
+        self.assertEqual(statuses, [200, 200, 200, 200, 429])
+
+    def test_students_behind_the_front_end_do_not_share_a_bucket(self):
+        front_end = {"REMOTE_ADDR": "127.0.0.1"}
+        # Five students from one browser address: the fifth hits the IP limit, no one else does.
+        statuses = [self.send_otp(f"student{i}@example.com", HTTP_X_FORWARDED_FOR="203.0.113.1", **front_end).status_code
+                    for i in range(5)]
+        self.assertEqual(statuses, [200, 200, 200, 200, 429])
+        self.assertEqual(self.send_otp("other@example.com", HTTP_X_FORWARDED_FOR="203.0.113.2", **front_end).status_code, 200)
+
+        # Without a forwarded address only the per-email buckets apply.
+        statuses = [self.send_otp(f"local{i}@example.com", **front_end).status_code for i in range(6)]
+        self.assertEqual(statuses, [200] * 6)
+        self.assertEqual([self.send_otp("local0@example.com", **front_end).status_code for _ in range(2)], [200, 429])
+
+    def test_verify_otp_buckets_refill_over_time(self):
+        payload = {"email": "a@example.com", "otp": "000000"}
+        now = 1_000_000.0
+        with mock.patch.object(throttling.time, "time", side_effect=lambda: now):
+            statuses = [self.client.post("/api/verify-otp/", payload, content_type="application/json").status_code
+                        for _ in range(4)]
+            self.assertEqual(statuses, [400, 400, 400, 429])
+            now += 20
+            self.assertEqual(self.client.post("/api/verify-otp/", payload, content_type="application/json").status_code, 400)
+            self.assertEqual(self.client.post("/api/verify-otp/", payload, content_type="application/json").status_code, 429)
+
+
+class AsyncURLConf:
+    """The API routed to async_views, as urls.py does when settings.ASYNC_VIEWS is on."""
+    urlpatterns = [path("api/", include(build_urlpatterns(async_views)))]
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": THROTTLE_RATES},
+                   EMAIL_QUEUE={**settings.EMAIL_QUEUE, "INLINE_WORKER": False})
+class AsyncViewTests(TestCase):
+    """Each scenario runs against the DRF views, then from a clean slate against the async views."""
+
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name="Computer Science", code="CSE")
+        semester = Semester.objects.create(number=1)
+        Subject.objects.create(code="CS101", name="Programming", credit=4, semester=semester, department=self.department)
+        for i, cgpa in enumerate(["8.50", "9.25", "7.75"], start=1):
+            result = UserResult.objects.create(email="a@example.com", department=self.department, semester=i,
+                                               cgpa=cgpa, total_credits=20, total_grade_points=float(cgpa) * 20)
+            aggregates.add_result(result)
+
+    def request(self, method, path, data=None, **kwargs):
+        if not settings.ASYNC_VIEWS:
+            return getattr(self.client, method)(path, data, **kwargs)
+        return async_to_sync(getattr(self.async_client, method))(path, data, **kwargs)
+
+    def outcomes(self, steps):
+        outcomes = []
+        for step in steps:
+            if callable(step):
+                step()
+                continue
+            response = self.request(*step[:3], **(step[3] if len(step) > 3 else {}))
+            body = response.json() if response["Content-Type"].startswith("application/json") else response.content
+            outcomes.append((step[1], response.status_code, body, response.get("Retry-After"), response.has_header("ETag")))
+        return outcomes
+
+    def assertSameInBothModes(self, steps):
+        expected = self.outcomes(steps)
+        cache.clear()
+        EmailOTP.objects.all().delete()
+        with override_settings(ROOT_URLCONF=AsyncURLConf, ASYNC_VIEWS=True):
+            self.assertEqual(self.outcomes(steps), expected)
+        return expected
+
+    def test_catalog(self):
+        self.assertSameInBothModes([
+            ("get", "/api/departments/"),
+            ("get", "/api/semesters/"),
+            ("get", "/api/subjects/1/CSE/"),
+            ("get", "/api/subjects/9/CSE/"),
+            ("get", "/api/subjects/1/NOPE/"),
+        ])
+
+    def test_history_and_overall_cgpa(self):
+        history = {"email": "a@example.com", "dept_id": self.department.pk}
+        outcomes = self.assertSameInBothModes([
+            ("get", "/api/user-history/", history),
+            ("get", "/api/user-history/", {**history, "page_size": 2, "page": 2}),
+            ("get", "/api/user-history/", {**history, "page": 5}),
+            ("get", "/api/user-history/", {**history, "pagination": "cursor", "page_size": 2}),
+            ("get", "/api/user-history/", {"dept_id": self.department.pk}),
+            ("get", "/api/user-history/", {**history, "dept_id": 999}),
+            ("get", "/api/calculate-cgpa/", history),
+            ("get", "/api/calculate-cgpa/", {**history, "email": "nobody@example.com"}),
+        ])
+        self.assertEqual(len(outcomes[0][2]["history"]), 3)
+        self.assertEqual(outcomes[6][2], {"cgpa": 8.5, "semester_count": 3})
+
+        with override_settings(ROOT_URLCONF=AsyncURLConf, ASYNC_VIEWS=True):
+            etag = self.request("get", "/api/user-history/", history)["ETag"]
+            self.assertEqual(self.request("get", "/api/user-history/", history, headers={"If-None-Match": etag}).status_code, 304)
+
+    def test_send_otp(self):
+        json_body = {"content_type": "application/json"}
+        self.assertSameInBothModes([
+            ("post", "/api/send-otp/", {"email": "a@example.com"}, json_body),
+            ("post", "/api/send-otp/", {"email": "b@example.com"}),
+            ("post", "/api/send-otp/", "email=c%40example.com", {"content_type": "application/x-www-form-urlencoded"}),
+            ("post", "/api/send-otp/", {}, json_body),
+            ("post", "/api/send-otp/", "{not json", json_body),
+            ("post", "/api/send-otp/", "email=d@example.com", {"content_type": "text/plain"}),
+            ("post", "/api/send-otp/", {"email": "a@example.com"}, json_body),
+            ("post", "/api/send-otp/", {"email": "a@example.com"}, json_body),
+        ])
+
+    def test_verify_otp(self):
+        def issue():
+            with mock.patch.object(otp_store.random.SystemRandom, "randint", return_value=123456):
+                otp_store.issue("a@example.com")
+
+        def expire():
+            EmailOTP.objects.update(created_at=timezone.now() - timedelta(hours=1))
+
+        json_body = {"content_type": "application/json"}
+        outcomes = self.assertSameInBothModes([
+            issue,
+            ("post", "/api/verify-otp/", {"email": "a@example.com", "otp": "123456"}, json_body),
+            issue,
+            ("post", "/api/verify-otp/", {"email": "a@example.com", "otp": "123456"}),
+            ("post", "/api/verify-otp/", {"email": "b@example.com", "otp": "000000"}, json_body),
+            ("post", "/api/verify-otp/", {"email": "b@example.com"}, json_body),
+            issue,
+            cache.clear,  # also refills the throttle buckets
+            expire,
+            ("post", "/api/verify-otp/", {"email": "a@example.com", "otp": "123456"}, json_body),
+            ("post", "/api/verify-otp/", {"email": "a@example.com", "otp": "000000"}, json_body),
+            ("post", "/api/verify-otp/", {"email": "a@example.com", "otp": "000000"}, json_body),
+            ("post", "/api/verify-otp/", {"email": "a@example.com", "otp": "000000"}, json_body),
+        ])
+        self.assertEqual([body for _, _, body, _, _ in outcomes], [
+            {"verified": True},
+            {"verified": True},
+            {"verified": False, "error": "Invalid OTP"},
+            {"verified": False, "error": "Email and OTP are required"},
+            {"verified": False, "error": "OTP expired"},
+            {"verified": False, "error": "Invalid OTP"},
+            {"verified": False, "error": "Invalid OTP"},
+            {"detail": "Request was throttled. Expected available in 20 seconds."},
+        ])
+
+    def test_export_streams_an_async_iterator(self):
+        User.objects.create_user("admin", is_staff=True)
+        self.async_client.force_login(User.objects.get())
+        expected = "".join(exporter.export_results())
+        with override_settings(ROOT_URLCONF=AsyncURLConf, ASYNC_VIEWS=True):
+            response = self.request("get", "/api/admin/export-results/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+
+        async def collect(chunks):
+            return [chunk async for chunk in chunks]
+
+        self.assertEqual(b"".join(async_to_sync(collect)(response.streaming_content)).decode(), expected)
+        chunks = async_to_sync(collect)(exporter.aexport_results(fmt="ndjson", chunk_size=1))
+        self.assertEqual(len(chunks), 3)
+
+
+@mock.patch.object(db_router, "replica_configured", return_value=True)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Runs outside a test transaction, which would pin every read to the primary."""
+
+    router = db_router.PrimaryReplicaRouter()
+
+    def read_alias(self, model):
+        # A fresh context, so pins left by earlier writes in the test do not apply.
+        return Context().run(self.router.db_for_read, model)
+
+    def test_catalog_and_history_reads_use_the_replica(self, _):
+        for model in (Department, Subject, UserResult, CGPAAggregate):
+            self.assertEqual(self.read_alias(model), "replica")
+        self.assertEqual(self.read_alias(EmailOTP), "default")
+
+    def test_reads_after_a_write_or_inside_a_transaction_use_the_primary(self, _):
+        def after_write():
+            self.router.db_for_write(UserResult)
+            return self.router.db_for_read(UserResult)
+
+        self.assertEqual(Context().run(after_write), "default")
+        with transaction.atomic():
+            self.assertEqual(self.read_alias(UserResult), "default")
+
+    def test_write_requests_pin_the_client_to_the_primary(self, _):
+        self.assertNotIn(db_router.STICKY_COOKIE, self.client.get("/api/semesters/").cookies)
+
+        response = self.client.post("/api/send-otp/", {"email": "student@example.com"}, content_type="application/json")
+
+        self.assertEqual(response.cookies[db_router.STICKY_COOKIE]["max-age"], 10)
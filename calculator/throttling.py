@@ -0,0 +1,163 @@
+"""Token-bucket throttles for the OTP endpoints, kept in the cache.
+
+Each (scope, client) pair gets a bucket of ``N`` tokens that refills at
+``N`` per period, from a DRF rate string in
+``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]`` such as ``"5/hour"``: a client
+can burst ``N`` requests and then continue at the average rate. A bucket is
+one cache entry (tokens left and when), so a check is a cache read plus, if
+allowed, a write, and never touches the database. Rejected requests get 429
+with Retry-After before any OTP row is written or email queued, and both
+decisions are counted in ``metrics.THROTTLE_DECISIONS``.
+
+Per-IP buckets key on the client address, except for requests from the
+Streamlit front end (``THROTTLE_FRONTEND_ADDRS``), which stand for many
+students and are keyed on the address it forwards in X-Forwarded-For.
+
+Like DRF's own throttles, the read-modify-write is not atomic: concurrent
+requests can occasionally overdraw a bucket by a token. A scope whose rate
+is ``None`` is not throttled.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def _cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+def parse_rate(rate):
+    """``"5/hour"`` -> (5 tokens, 3600 seconds), like DRF's SimpleRateThrottle."""
+    num, period = rate.split("/")
+    return int(num), DURATIONS[period[0]]
+
+
+class TokenBucket:
+    def __init__(self, scope):
+        self.scope = scope
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            self.capacity = None
+        else:
+            self.capacity, self.period = parse_rate(rate)
+            self.refill = self.capacity / self.period
+
+    def _key(self, ident):
+        return f"throttle:{self.scope}:" + hashlib.sha256(ident.encode()).hexdigest()
+
+    def _take(self, state, now):
+        """(new state, None) when a token is available, else (None, seconds until one is)."""
+        tokens, stamp = state or (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - stamp) * self.refill)
+        if tokens >= 1:
+            return (tokens - 1, now), None
+        return None, (1 - tokens) / self.refill
+
+    def _decided(self, wait):
+        metrics.THROTTLE_DECISIONS.inc(scope=self.scope, outcome="allowed" if wait is None else "throttled")
+        return wait
+
+    def consume(self, ident):
+        """Take a token for ``ident``; returns None if allowed, else the seconds to wait."""
+        if self.capacity is None:
+            return None
+        cache = _cache()
+        key = self._key(ident)
+        state, wait = self._take(cache.get(key), time.time())
+        if state is not None:
+            # An idle bucket is full again after one period, so it can expire then.
+            cache.set(key, state, timeout=math.ceil(self.period))
+        return self._decided(wait)
+
+    async def aconsume(self, ident):
+        if self.capacity is None:
+            return None
+        cache = _cache()
+        key = self._key(ident)
+        state, wait = self._take(await cache.aget(key), time.time())
+        if state is not None:
+            await cache.aset(key, state, timeout=math.ceil(self.period))
+        return self._decided(wait)
+
+
+class BucketThrottle(BaseThrottle):
+    """DRF throttle backed by a ``TokenBucket`` for ``scope``; subclasses pick the client identity."""
+
+    scope = None
+
+    def __init__(self):
+        self.bucket = TokenBucket(self.scope)
+        self.wait_seconds = None
+
+    def identify(self, request, data):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        data = request.data if isinstance(request.data, dict) else {}
+        ident = self.identify(request, data)
+        if ident is None:
+            return True
+        self.wait_seconds = self.bucket.consume(ident)
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class EmailThrottle(BucketThrottle):
+    def identify(self, request, data):
+        email = data.get("email")
+        # Case variants reach the same mailbox, so they share a bucket.
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class IPThrottle(BucketThrottle):
+    def identify(self, request, data):
+        if request.META.get("REMOTE_ADDR") in settings.THROTTLE_FRONTEND_ADDRS:
+            # The front end calls for every student; bucket on the address
+            # it forwards, or leave the request to the email buckets.
+            forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")[-1].strip()
+            return forwarded or None
+        return self.get_ident(request)
+
+
+class SendOTPEmailThrottle(EmailThrottle):
+    scope = "otp_send_email"
+
+
+class SendOTPIPThrottle(IPThrottle):
+    scope = "otp_send_ip"
+
+
+class VerifyOTPEmailThrottle(EmailThrottle):
+    scope = "otp_verify_email"
+
+
+class VerifyOTPIPThrottle(IPThrottle):
+    scope = "otp_verify_ip"
+
+
+SEND_OTP_THROTTLES = [SendOTPIPThrottle, SendOTPEmailThrottle]
+VERIFY_OTP_THROTTLES = [VerifyOTPIPThrottle, VerifyOTPEmailThrottle]
+
+
+async def acheck(throttle_classes, request, data):
+    """Async twin of DRF's ``check_throttles``: the longest wait in seconds, or None if allowed."""
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        ident = throttle.identify(request, data)
+        if ident is not None:
+            wait = await throttle.bucket.aconsume(ident)
+            if wait is not None:
+                waits.append(wait)
+    return max(waits) if waits else None
@@ -1,15 +1,28 @@
+from django.conf import settings
 from django.urls import path
-from . import views
-
-urlpatterns = [
-    path('departments/', views.list_departments),
-    path('send-otp/', views.send_otp),
-    path('verify-otp/', views.verify_otp),
-    path('subjects/<int:sem_num>/<str:dept_code>/', views.subjects_by_semester_and_department),
-    path("semesters/", views.list_semesters),
-    path("save-result/", views.save_results),
-    path("user-history/", views.user_historys),
-    path('admin-results/',views.admin_all_results),
-    path("calculate-cgpa/", views.calculate_overall_cgpa),
-    path("delete-result/", views.delete_result),
-]
+from . import async_views, views
+
+
+def build_urlpatterns(read_views):
+    """Routes with the read endpoints served by ``read_views`` (views or async_views)."""
+    return [
+        path('departments/', read_views.list_departments),
+        path('send-otp/', read_views.send_otp),
+        path('verify-otp/', read_views.verify_otp),
+        path('subjects/<int:sem_num>/<str:dept_code>/', read_views.subjects_by_semester_and_department),
+        path("semesters/", read_views.list_semesters),
+        path("curriculum/<str:dept_code>/", views.department_curriculum),
+        path("save-result/", views.save_results),
+        path("compute-gpa/", views.compute_gpa),
+        path("user-history/", read_views.user_historys),
+        path('admin-results/',views.admin_all_results),
+        path('admin/import-results/', views.admin_import_results),
+        path('admin/export-results/', views.admin_export_results),
+        path("calculate-cgpa/", read_views.calculate_overall_cgpa),
+        path("cgpa-rank/", views.cgpa_rank),
+        path("analytics/summary/", views.result_analytics),
+        path("delete-result/", views.delete_result),
+    ]
+
+
+urlpatterns = build_urlpatterns(async_views if settings.ASYNC_VIEWS else views)
@@ -1,51 +1,45 @@
-import random
-from django.core.mail import send_mail
-from .models import EmailOTP
+import io
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework.permissions import IsAdminUser
-from django.utils import timezone
-from datetime import timedelta
-from .models import Semester, UserResult,Department,Subject
-from rest_framework.decorators import api_view,permission_classes
+from .models import Semester, UserResult,Department,Subject,CGPAAggregate,ResultSummary
+from rest_framework.decorators import api_view,permission_classes,parser_classes,throttle_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
-from calculator.pagination import DynamicPageNumberPagination
-from .serializers import UserSerializer,SubjectSerializer,DepartmentSerializer, EmailSerializer
-
+from calculator.pagination import DynamicPageNumberPagination, KeysetPagination
+from calculator import aggregates, analytics, catalog, etags, grading, metrics, otp_store, ranking
+from calculator.throttling import SEND_OTP_THROTTLES, VERIFY_OTP_THROTTLES
+from calculator import exporter
+from calculator.filters import filter_results
+from calculator.importer import FORMATS, guess_format, import_results
+from .serializers import USER_RESULT_VALUES, UserSerializer,SubjectSerializer,DepartmentSerializer, EmailSerializer, GPARequestSerializer
+
+@etags.condition(etags.catalog_etag)
 @api_view(["GET"])
 def list_departments(request):
-    departments = Department.objects.all()
-    serializer = DepartmentSerializer(departments, many=True)
-    return Response({"departments": serializer.data}, status=status.HTTP_200_OK)
+    return Response({"departments": catalog.departments()}, status=status.HTTP_200_OK)
 
 
 
 
 @api_view(["POST"])
+@throttle_classes(SEND_OTP_THROTTLES)
 def send_otp(request):
     email = request.data.get("email")
     
     if not email:
         return Response({"error": "Email is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    otp = str(random.randint(100000, 999999))
-    print(f"Sending OTP to {email}: {otp}")
-
-    
-    EmailOTP.objects.create(email=email, otp=otp)
-
-   
-    send_mail(
-        subject="Your CGPA Calculator OTP",
-        message=f"Your OTP is {otp}",
-        from_email="pradeepkumarravi.softsuave@gmail.com",
-        recipient_list=[email],
-    )
-
+    otp_store.issue_and_send(email)
     return Response({"message": "OTP sent"}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(method="post",request_body=EmailSerializer)
 @api_view(["POST"])
+@throttle_classes(VERIFY_OTP_THROTTLES)
 def verify_otp(request):
     email = request.data.get("email")
     otp = request.data.get("otp")
@@ -53,37 +47,41 @@ def verify_otp(request):
     if not email or not otp:
         return Response({"verified": False, "error": "Email and OTP are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        record = EmailOTP.objects.filter(email=email, otp=otp).latest('created_at')
-        if timezone.now() - record.created_at <= timedelta(minutes=30):
-            return Response({"verified": True}, status=status.HTTP_200_OK)
-        else:
-            return Response({"verified": False, "error": "OTP expired"}, status=status.HTTP_400_BAD_REQUEST)
-    except EmailOTP.DoesNotExist:
+    outcome = otp_store.verify(email, otp)
+    if outcome == otp_store.VERIFIED:
+        return Response({"verified": True}, status=status.HTTP_200_OK)
+    elif outcome == otp_store.EXPIRED:
+        return Response({"verified": False, "error": "OTP expired"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
         return Response({"verified": False, "error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
 
 
     
+@etags.condition(etags.catalog_etag)
 @api_view(["GET"])
 def subjects_by_semester_and_department(request, sem_num, dept_code):
     try:
-        semester = Semester.objects.get(number=sem_num)
-        department = Department.objects.get(code=dept_code)
-        subjects = Subject.objects.filter(semester=semester, department=department)
-
-        serializer = SubjectSerializer(subjects, many=True)
-        return Response({"subjects": serializer.data}, status=status.HTTP_200_OK)
+        subjects = catalog.subjects(sem_num, dept_code)
+        return Response({"subjects": subjects}, status=status.HTTP_200_OK)
     except Semester.DoesNotExist:
         return Response({"error": "Semester not found"}, status=status.HTTP_404_NOT_FOUND)
     except Department.DoesNotExist:
         return Response({"error": "Department not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
+@etags.condition(etags.catalog_etag)
+@api_view(["GET"])
+def department_curriculum(request, dept_code):
+    try:
+        return Response(catalog.curriculum(dept_code), status=status.HTTP_200_OK)
+    except Department.DoesNotExist:
+        return Response({"error": "Department not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+@etags.condition(etags.catalog_etag)
 @api_view(["GET"])
 def list_semesters(request):
-    semesters = Semester.objects.all().order_by("number")
-    data = [sem.number for sem in semesters]
-    return Response({"semesters": data}, status=status.HTTP_200_OK)
+    return Response({"semesters": catalog.semesters()}, status=status.HTTP_200_OK)
 
 
 
@@ -97,15 +95,68 @@ def save_results(request):
     if not email or not semester:
         return Response({"error":"email and semester are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    UserResult.objects.filter(email=email,semester=semester,department=department).delete() 
+    if "subjects" in data:
+        grades = GPARequestSerializer(data={"department": department, "semester": semester, "subjects": data["subjects"]})
+        if not grades.is_valid():
+            return Response(grades.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            computed = grading.compute_semester(
+                grades.validated_data["department"], semester, grades.validated_data["subjects"]
+            )
+        except grading.GradingError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if computed["gpa"] is None:
+            return Response({"error": "No valid grades to calculate CGPA."}, status=status.HTTP_400_BAD_REQUEST)
+        data = {
+            "email": email,
+            "department": department,
+            "semester": semester,
+            "cgpa": computed["gpa"],
+            "total_credits": computed["total_credits"],
+            "total_grade_points": computed["total_grade_points"],
+            "arrear_count": computed["arrear_count"],
+        }
 
     serializer = UserSerializer(data=data)
-    if serializer.is_valid():
-        serializer.save()
-        return Response({"message": "Result saved successfully"}, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        replaced = analytics.result_values(email, department, semester)
+        aggregates.delete_results(email, department, semester=semester)
+        result = serializer.save()
+        aggregates.add_result(result)
+        analytics.apply_delta(result.department_id, result.semester, replaced, [(result.cgpa, result.arrear_count)])
+    return Response({
+        "message": "Result saved successfully",
+        "cgpa": result.cgpa,
+        "total_credits": result.total_credits,
+        "total_grade_points": result.total_grade_points,
+    }, status=status.HTTP_201_CREATED)
+
+
+@swagger_auto_schema(method="post",request_body=GPARequestSerializer)
+@api_view(["POST"])
+def compute_gpa(request):
+    serializer = GPARequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    try:
+        if "subjects" in data:
+            result = grading.compute_semester(data["department"], data["semester"], data["subjects"])
+            return Response(result, status=status.HTTP_200_OK)
+        results = grading.compute_batch(data["department"], data["semester"], data["students"])
+    except grading.GradingError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    for student, result in zip(data["students"], results):
+        result["email"] = student.get("email")
+    return Response({"results": results}, status=status.HTTP_200_OK)
 
+
+@etags.condition(etags.history_etag)
 @api_view(["GET"])
 def user_historys(request):
     email = request.query_params.get("email")
@@ -117,41 +168,113 @@ def user_historys(request):
     except Department.DoesNotExist:
         return Response({"error": "Invalid department ID"}, status=status.HTTP_404_NOT_FOUND)
     
-    results = UserResult.objects.filter(email=email,department=department).order_by('created_at')
+    results = USER_RESULT_VALUES.values(UserResult.objects.filter(email=email,department=department).order_by('created_at'))
+    if request.query_params.get("pagination") == "cursor":
+        paginator = KeysetPagination(descending=False)
+        paginated = paginator.paginate_queryset(results, request)
+        data = paginator.get_paginated_data(USER_RESULT_VALUES.serialize(paginated))
+        return Response({"history": data.pop("results"), **data}, status=status.HTTP_200_OK)
+
     paginator = DynamicPageNumberPagination()
     paginated = paginator.paginate_queryset(results,request)
-    serializer = UserSerializer(paginated, many=True)
-    return Response({"history":serializer.data},status=status.HTTP_200_OK)
+    return Response({"history":USER_RESULT_VALUES.serialize(paginated)},status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 def admin_all_results(request):
-    paginator = DynamicPageNumberPagination()
+    if request.query_params.get("pagination") == "cursor":
+        paginator = KeysetPagination()
+    else:
+        paginator = DynamicPageNumberPagination()
     paginator.page_size = 5
-    results = UserResult.objects.all().order_by('-created_at')
-    paginated = paginator.paginate_queryset(results, request)
-    serializer = UserSerializer(paginated, many=True)
-    return paginator.get_paginated_response(serializer.data)
+    try:
+        results = filter_results(UserResult.objects.all(), request.query_params).order_by('-created_at')
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    paginated = paginator.paginate_queryset(USER_RESULT_VALUES.values(results), request)
+    return paginator.get_paginated_response(USER_RESULT_VALUES.serialize(paginated))
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+@parser_classes([MultiPartParser])
+def admin_import_results(request):
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+    fmt = request.data.get("format") or guess_format(upload.name)
+    if fmt not in FORMATS:
+        return Response({"error": f"format must be one of {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+    try:
+        report = import_results(stream, fmt, chunk_size=int(request.data.get("chunk_size", 1000)))
+    except (UnicodeDecodeError, ValueError) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def admin_export_results(request):
+    # "format" is reserved by DRF for renderer selection.
+    fmt = request.query_params.get("export_format", "csv")
+    if fmt not in exporter.FORMATS:
+        return Response({"error": f"export_format must be one of {', '.join(exporter.FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        results = filter_results(UserResult.objects.all(), request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # An ASGI server would buffer a sync iterator in full; hand it an async one.
+    export = exporter.aexport_results if settings.ASYNC_VIEWS else exporter.export_results
+    response = StreamingHttpResponse(export(results, fmt), content_type=exporter.CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="results.{fmt}"'
+    return response
+
+
+@api_view(["GET"])
+def result_analytics(request):
+    summaries = ResultSummary.objects.order_by("department_id", "semester")
+    try:
+        if request.query_params.get("dept_id"):
+            summaries = summaries.filter(department=int(request.query_params["dept_id"]))
+        if request.query_params.get("semester"):
+            summaries = summaries.filter(semester=int(request.query_params["semester"]))
+    except ValueError:
+        return Response({"error": "dept_id and semester must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+    data = [analytics.as_dict(summary) for summary in summaries]
+    return Response({"summaries": data}, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 def calculate_overall_cgpa(request):
     email = request.query_params.get("email")
     department = request.query_params.get("dept_id")
-    results = UserResult.objects.filter(email=email,department=department)
-    print("results for oacgpa--------------------------",results)
-    total_credits = 0
-    total_grade_points = 0.0
+    aggregate = CGPAAggregate.objects.filter(email=email,department=department).first()
+
+    if aggregate is None or aggregate.total_credits == 0:
+        return Response({"error": "No credits found."}, status=400)
+
+    return Response({"cgpa": aggregate.cgpa, "semester_count": aggregate.semester_count})
 
-    for res in results:
-        total_credits += res.total_credits
-        total_grade_points += res.total_grade_points
+@api_view(["GET"])
+def cgpa_rank(request):
+    email = request.query_params.get("email")
+    department = request.query_params.get("dept_id")
+    if not email or not department:
+        return Response({"error": "email and dept_id are required"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        department = int(department)
+    except ValueError:
+        return Response({"error": "Invalid department ID"}, status=status.HTTP_400_BAD_REQUEST)
 
-    if total_credits == 0:
+    aggregate = CGPAAggregate.objects.filter(email=email, department=department).first()
+    if aggregate is None or aggregate.total_credits == 0:
         return Response({"error": "No credits found."}, status=400)
 
-    cgpa = round(total_grade_points / total_credits, 2)
-    return Response({"cgpa": cgpa, "semester_count": results.count()})
+    position = ranking.rank(department, aggregate.total_grade_points / aggregate.total_credits)
+    return Response({"cgpa": aggregate.cgpa, **position}, status=status.HTTP_200_OK)
 
 @api_view(["DELETE"])
 def delete_result(request):
@@ -165,14 +288,19 @@ def delete_result(request):
     if not email or not semester or not department:
         return Response({"error": "Missing params"}, status=400)
 
-    deleted, _ = UserResult.objects.filter(
-        email=email,
-        semester=semester,
-        department=department
-    ).delete()
+    with transaction.atomic():
+        removed = analytics.result_values(email, department, semester)
+        deleted = aggregates.delete_results(email, department, semester=semester)
+        if deleted:
+            analytics.apply_delta(department, semester, removed=removed)
 
     if deleted:
         return Response({"message": "Record deleted"}, status=200)
     else:
         return Response({"error": "Record not found"}, status=404)
 
+
+@require_GET
+def prometheus_metrics(request):
+    # A plain Django view: Prometheus expects its own text format, not a DRF renderer.
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
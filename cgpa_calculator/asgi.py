@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cgpa_calculator.settings')
+os.environ.setdefault('CGPA_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+from calculator.ranking import warm_on_startup  # noqa: E402
+
+warm_on_startup()
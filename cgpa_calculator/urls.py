@@ -20,6 +20,8 @@ from drf_yasg import openapi
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 
+from calculator.views import prometheus_metrics
+
 
 schema_view = get_schema_view(
    openapi.Info(
@@ -34,6 +36,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('calculator.urls')),
+    path('metrics', prometheus_metrics),
 
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cgpa_calculator.settings')
 
 application = get_wsgi_application()
+
+from calculator.ranking import warm_on_startup  # noqa: E402
+
+warm_on_startup()
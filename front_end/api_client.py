@@ -0,0 +1,386 @@
+"""Shared HTTP client for the Streamlit app.
+
+One pooled ``requests.Session`` is kept per server process
+(``st.cache_resource``) so reruns reuse keep-alive connections, and catalog
+lookups are memoised with a TTL (``st.cache_data``) so widget interactions do
+not refetch departments, semesters and subjects. When a memoised entry
+expires, ``get_json`` revalidates it with the ETag the server sent, and an
+unchanged resource comes back as an empty 304.
+
+Admin result pages live in a small LRU (``PageCache``) that a background
+thread fills with the pages either side of the one on screen, so paging
+is served locally; saving or deleting a result empties it. ``RerunFetches`` runs one script run's independent
+lookups concurrently and times them.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+BACKEND_URL = "http://localhost:8000/api"
+
+# (connect, read) seconds
+TIMEOUT = (3.05, 15)
+CATALOG_TTL = 10 * 60
+HISTORY_TTL = 60
+# Validated bodies kept for conditional GETs, oldest evicted first.
+VALIDATOR_CACHE_SIZE = 256
+ADMIN_PAGE_CACHE_SIZE = 32
+ADMIN_PAGE_TTL = 30
+
+
+@st.cache_resource
+def get_session():
+    # Only idempotent methods are retried on a response status; POSTs are
+    # retried solely when the connection could not be established.
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get(path, params=None, headers=None):
+    return get_session().get(f"{BACKEND_URL}{path}", params=params, headers=headers, timeout=TIMEOUT)
+
+
+class ValidatorCache:
+    """Bounded LRU of (ETag, decoded body) per request, shared by the fetch pool threads."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, etag, body):
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def _validated():
+    """(path, params) -> (ETag, decoded body) of the last 200 response carrying an ETag."""
+    return ValidatorCache(VALIDATOR_CACHE_SIZE)
+
+
+def get_json(path, params=None):
+    """GET a JSON resource, sending If-None-Match for a body fetched before.
+
+    Raises ``requests.RequestException`` on failure, like ``raise_for_status``.
+    """
+    key = (path, tuple(sorted((params or {}).items())))
+    validated = _validated()
+    cached = validated.get(key)
+    res = get(path, params=params, headers={"If-None-Match": cached[0]} if cached else None)
+    if res.status_code == 304 and cached:
+        return cached[1]
+    res.raise_for_status()
+    body = res.json()
+    etag = res.headers.get("ETag")
+    if etag:
+        validated.put(key, etag, body)
+    return body
+
+
+def post(path, payload, headers=None):
+    return get_session().post(f"{BACKEND_URL}{path}", json=payload, headers=headers, timeout=TIMEOUT)
+
+
+def _client_headers():
+    """Forward the student's IP, so the backend's per-IP OTP limits are not shared by everyone using this server."""
+    ip = st.context.ip_address
+    return {"X-Forwarded-For": ip} if ip else None
+
+
+def delete(path, params=None):
+    return get_session().delete(f"{BACKEND_URL}{path}", params=params, timeout=TIMEOUT)
+
+
+# Cached functions raise on failure so an error is never memoised; the
+# public wrappers below turn failures back into empty results.
+
+@st.cache_data(ttl=CATALOG_TTL, show_spinner=False)
+def fetch_departments():
+    return get_json("/departments/").get("departments", [])
+
+
+@st.cache_data(ttl=CATALOG_TTL, show_spinner=False)
+def _fetch_semesters():
+    return get_json("/semesters/").get("semesters", [])
+
+
+@st.cache_data(ttl=CATALOG_TTL, show_spinner=False)
+def _fetch_curriculum(department_code):
+    return get_json(f"/curriculum/{department_code}/")
+
+
+@st.cache_data(ttl=HISTORY_TTL, show_spinner=False)
+def _fetch_history(email, dept_id):
+    return get_json("/user-history/", params={"email": email, "dept_id": dept_id}).get("history", [])
+
+
+def fetch_semesters():
+    try:
+        return _fetch_semesters()
+    except requests.RequestException:
+        return []
+
+
+def fetch_curriculum(department_code):
+    """Every semester's subjects for the department, or {} if the backend request failed."""
+    try:
+        return _fetch_curriculum(department_code)
+    except requests.RequestException:
+        return {}
+
+
+def semester_subjects(curriculum, semester):
+    for sem in curriculum.get("semesters", []):
+        if str(sem["number"]) == str(semester):
+            return sem["subjects"]
+    return []
+
+
+def fetch_subjects(semester, department_code):
+    return semester_subjects(fetch_curriculum(department_code), semester)
+
+
+def fetch_history(email, dept_id):
+    """Return the user's history, or None if the backend request failed."""
+    try:
+        return _fetch_history(email, dept_id)
+    except requests.RequestException:
+        return None
+
+
+def invalidate_history(email, dept_id):
+    """Drop the cached history of one student in one department."""
+    _fetch_history.clear(email, dept_id)
+
+
+def send_otp(email):
+    return post("/send-otp/", {"email": email}, headers=_client_headers()).json()
+
+
+def verify_otp(email, otp):
+    return post("/verify-otp/", {"email": email, "otp": otp}, headers=_client_headers()).json()
+
+
+def calculate_overall_cgpa(email, dept_id):
+    return get("/calculate-cgpa/", params={"email": email, "dept_id": dept_id})
+
+
+def save_result(payload):
+    res = post("/save-result/", payload)
+    invalidate_history(payload.get("email"), payload.get("department"))
+    invalidate_admin_pages()
+    return res
+
+
+def delete_result(params):
+    res = delete("/delete-result/", params=params)
+    invalidate_history(params.get("email"), params.get("department"))
+    invalidate_admin_pages()
+    return res
+
+
+@st.cache_resource
+def _fetch_pool():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="rerun-fetch")
+
+
+class RerunFetches:
+    """The backend lookups of one script run, each started as soon as its inputs are known.
+
+    ``start`` hands a call to a shared thread pool and returns at once;
+    ``get`` starts it if needed and waits for the result. The critical path
+    is when the last result the run waited for became ready, measured from
+    the start of the run; ``serial_ms`` is what the same calls cost back to
+    back.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._futures = {}
+        self._timings = {}
+        self._waited = []
+
+    def start(self, name, fn, *args):
+        if name in self._futures:
+            return
+        ctx = get_script_run_ctx()
+
+        def run():
+            # st.cache_data needs the session's context on this pool thread.
+            add_script_run_ctx(threading.current_thread(), ctx)
+            began = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._timings[name] = (began - self.started_at, time.perf_counter() - began)
+
+        self._futures[name] = _fetch_pool().submit(run)
+
+    def get(self, name, fn, *args):
+        self.start(name, fn, *args)
+        if name not in self._waited:
+            self._waited.append(name)
+        return self._futures[name].result()
+
+    def timings(self):
+        """(critical path ms, serial ms, {name: duration ms}) over the calls the run waited for."""
+        spans = {name: self._timings[name] for name in self._waited if name in self._timings}
+        critical = max((start + duration for start, duration in spans.values()), default=0.0)
+        serial = sum(duration for _, duration in spans.values())
+        return critical * 1000, serial * 1000, {name: duration * 1000 for name, (_, duration) in spans.items()}
+
+    def summary(self):
+        critical, serial, calls = self.timings()
+        detail = ", ".join(f"{name} {ms:.0f} ms" for name, ms in calls.items())
+        return f"Data ready after {critical:.0f} ms ({serial:.0f} ms of calls: {detail or 'none'})"
+
+    def log(self):
+        logger.info(self.summary())
+
+
+class PageCache:
+    """Bounded LRU of result pages held as ``Future`` objects.
+
+    A page that is still being prefetched is waited for rather than fetched
+    a second time. Entries expire after ``ttl`` seconds, and failed loads are
+    dropped on the next lookup so they are retried.
+    """
+
+    def __init__(self, executor, maxsize, ttl):
+        self.executor = executor
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        loaded_at, future = entry
+        if time.monotonic() - loaded_at > self.ttl or (future.done() and future.exception()):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return future
+
+    def _store(self, key, future):
+        self._entries[key] = (time.monotonic(), future)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key, load):
+        """The page for ``key``, calling ``load()`` in this thread if it is neither cached nor in flight."""
+        with self._lock:
+            future = self._fresh(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._store(key, future)
+        if owner:
+            try:
+                future.set_result(load())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def prefetch(self, key, load):
+        with self._lock:
+            if self._fresh(key) is None:
+                self._store(key, self.executor.submit(load))
+
+    def clear(self):
+        """Forget every page; loads still in flight finish but are not kept."""
+        with self._lock:
+            self._entries.clear()
+
+
+@st.cache_resource
+def _admin_pages():
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="admin-prefetch")
+    return PageCache(executor, ADMIN_PAGE_CACHE_SIZE, ADMIN_PAGE_TTL)
+
+
+def invalidate_admin_pages():
+    """Drop cached admin pages, whose rows and counts a save or delete may have changed."""
+    _admin_pages().clear()
+
+
+class FilterError(ValueError):
+    """The backend rejected the admin search filters (HTTP 400)."""
+
+
+def _load_admin_page(session, cursor, page_size, filters):
+    # Runs on prefetch threads too, so it takes the session instead of calling st.* helpers.
+    params = {"pagination": "cursor", "count": "estimate", "page_size": page_size, **dict(filters)}
+    if cursor:
+        params["cursor"] = cursor
+    res = session.get(f"{BACKEND_URL}/admin-results/", params=params, timeout=TIMEOUT)
+    if res.status_code == 400:
+        raise FilterError(res.json().get("error", "Invalid filters"))
+    res.raise_for_status()
+    data = res.json()
+    return {
+        "results": data.get("results", []),
+        "next": cursor_from(data.get("next")),
+        "previous": cursor_from(data.get("previous")),
+        "count": data.get("count", 0),
+    }
+
+
+def _admin_page_args(cursor, page_size, filters):
+    filters = tuple(sorted((filters or {}).items()))
+    return (cursor, page_size, filters), partial(_load_admin_page, get_session(), cursor, page_size, filters)
+
+
+def fetch_admin_page(cursor=None, page_size=50, filters=None):
+    """One page of results matching ``filters``, newest first, using keyset pagination.
+
+    Returns a dict with ``results``, ``next``/``previous`` cursors and an
+    estimated ``count``; raises ``FilterError`` or ``requests.RequestException``.
+    """
+    key, load = _admin_page_args(cursor, page_size, filters)
+    return _admin_pages().get(key, load)
+
+
+def prefetch_admin_pages(page, page_size=50, filters=None):
+    """Start loading the pages before and after ``page`` in the background."""
+    for cursor in (page["next"], page["previous"]):
+        if cursor:
+            _admin_pages().prefetch(*_admin_page_args(cursor, page_size, filters))
+
+
+def cursor_from(link):
+    """Extract the cursor token from a next/previous link."""
+    if not link:
+        return None
+    return parse_qs(urlparse(link).query).get("cursor", [None])[0]
@@ -1,42 +1,18 @@
 import streamlit as st
-import requests
+import os
 import re
 
-BACKEND_URL = "http://localhost:8000/api"
+import pandas as pd
+
+import api_client as api
+
+# Show each rerun's data-loading critical path in the sidebar (it is always logged).
+SHOW_LOAD_TIMINGS = os.environ.get("CGPA_SHOW_LOAD_TIMINGS") == "1"
 
 def is_valid_email(email):
     pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
     return re.match(pattern, email)
 
-def send_otp(email):
-    res = requests.post(f"{BACKEND_URL}/send-otp/", json={"email": email})
-    return res.json()
-
-def verify_otp(email, otp):
-    res = requests.post(f"{BACKEND_URL}/verify-otp/", json={"email": email, "otp": otp})
-    return res.json()
-
-GRADE_POINT_MAP = {
-    "O": 10,
-    "A+": 9,
-    "A": 8,
-    "B+": 7,
-    "B": 6,
-    "C": 5,
-}
-
-def fetch_subjects(semester, department_code):
-    res = requests.get(f"{BACKEND_URL}/subjects/{semester}/{department_code}/")
-    if res.status_code == 200:
-        return res.json().get("subjects", [])
-    return []
-
-def fetch_semesters():
-    res = requests.get(f"{BACKEND_URL}/semesters/")
-    if res.status_code == 200:
-        return res.json().get("semesters", [])
-    return []
-
 def admin_authenticate():
     st.title("Admin Authentication")
 
@@ -55,31 +31,93 @@ def admin_authenticate():
         st.error("Invalid email")
 
 
-def fetch_admin_results(page):
+# Rows per admin page; the API allows up to 100.
+ADMIN_PAGE_SIZE = 50
+
+def fetch_admin_results(cursor, filters):
     try:
-        res = requests.get(f"{BACKEND_URL}/admin-results/?page={page}")
-        if res.status_code == 200:
-            data = res.json()
-            count = data.get("count", 0)
-            page_size = 5  
-            total_pages = (count + page_size - 1) // page_size  
-            return {
-                "results": data.get("results", []),
-                "next": data.get("next"),
-                "previous": data.get("previous"),
-                "total_pages": total_pages
-            }
+        page = api.fetch_admin_page(cursor, page_size=ADMIN_PAGE_SIZE, filters=filters)
+    except api.FilterError as e:
+        st.error(str(e))
     except Exception as e:
         st.error(f"Failed to fetch admin results: {e}")
+    else:
+        api.prefetch_admin_pages(page, page_size=ADMIN_PAGE_SIZE, filters=filters)
+        return {**page, "total_pages": max(1, -(-page["count"] // ADMIN_PAGE_SIZE))}
     return {"results": [], "next": None, "previous": None, "total_pages": 1}
 
 
+def results_table(results):
+    try:
+        departments = {d["id"]: d["code"] for d in api.fetch_departments()}
+    except Exception:
+        departments = {}
+    table = pd.DataFrame(results, columns=["email", "cgpa", "semester", "department", "created_at"])
+    table["cgpa"] = pd.to_numeric(table["cgpa"])
+    table["department"] = table["department"].map(lambda d: departments.get(d, "N/A"))
+    table["created_at"] = pd.to_datetime(table["created_at"])
+    return table
+
+
+def admin_filter_panel():
+    """Search form; the filters run on the server, and applying them restarts paging."""
+    filters = st.session_state.get("admin_filters", {})
+    with st.expander("Search results", expanded=bool(filters)):
+        with st.form("admin_filter_form"):
+            try:
+                departments = ["All"] + [d["code"] for d in api.fetch_departments()]
+            except Exception:
+                departments = ["All"]
+            semesters = ["All"] + [str(number) for number in api.fetch_semesters()]
+
+            col1, col2 = st.columns(2)
+            with col1:
+                department = st.selectbox("Department", departments,
+                                          index=departments.index(filters["department"]) if filters.get("department") in departments else 0)
+                email = st.text_input("Student email", value=filters.get("email") or filters.get("email_prefix", ""))
+                prefix = st.checkbox("Match emails starting with this text", value="email_prefix" in filters)
+            with col2:
+                semester = st.selectbox("Semester", semesters,
+                                        index=semesters.index(filters["semester"]) if filters.get("semester") in semesters else 0)
+                cgpa_range = st.slider("CGPA range", 0.0, 10.0,
+                                       (float(filters.get("min_cgpa", 0)), float(filters.get("max_cgpa", 10))), step=0.1)
+                dates = st.date_input("Saved between", value=())
+
+            apply, clear = st.columns(2)
+            applied = apply.form_submit_button("Apply")
+            cleared = clear.form_submit_button("Clear")
+
+    if not (applied or cleared):
+        return filters
+
+    new_filters = {}
+    if applied:
+        if department != "All":
+            new_filters["department"] = department
+        if semester != "All":
+            new_filters["semester"] = semester
+        if cgpa_range[0] > 0:
+            new_filters["min_cgpa"] = f"{cgpa_range[0]:.2f}"
+        if cgpa_range[1] < 10:
+            new_filters["max_cgpa"] = f"{cgpa_range[1]:.2f}"
+        if email.strip():
+            new_filters["email_prefix" if prefix else "email"] = email.strip()
+        if len(dates) >= 1:
+            new_filters["since"] = dates[0].isoformat()
+        if len(dates) == 2:
+            new_filters["until"] = dates[1].isoformat()
+    st.session_state["admin_filters"] = new_filters
+    st.session_state["admin_cursor"] = None
+    st.session_state["admin_page"] = 1
+    st.rerun()
+
 
 def admin_dashboard():
     st.title("All CGPA Logs - Admin View")
 
+    filters = admin_filter_panel()
     page = st.session_state.get("admin_page", 1)
-    data = fetch_admin_results(page)
+    data = fetch_admin_results(st.session_state.get("admin_cursor"), filters)
 
     results = data.get("results", [])
     total_pages = data.get("total_pages", 1)
@@ -90,15 +128,18 @@ def admin_dashboard():
         st.info("No results available.")
         return
 
-    for r in results:
-        st.markdown(f"""
-        **Email**: {r['email']}  
-        **CGPA**: {r['cgpa']}  
-        **Semester**: {r['semester']}  
-        **Department**: {r.get('department', 'N/A')}  
-        **Date**: {r['created_at']}
-        --------------------------
-        """)
+    st.dataframe(
+        results_table(results),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "email": st.column_config.TextColumn("Email"),
+            "cgpa": st.column_config.NumberColumn("CGPA", format="%.2f"),
+            "semester": st.column_config.NumberColumn("Semester"),
+            "department": st.column_config.TextColumn("Department"),
+            "created_at": st.column_config.DatetimeColumn("Date", format="YYYY-MM-DD HH:mm"),
+        },
+    )
 
     if st.button("Exit"):
         st.session_state["admin_auth_pending"] = False
@@ -109,32 +150,31 @@ def admin_dashboard():
     with col1:
         if prev_page and st.button("<-- Previous"):
             st.session_state["admin_page"] = page - 1
+            st.session_state["admin_cursor"] = prev_page
             st.rerun()
 
     with col2:
         if next_page and st.button("Next -->"):
             st.session_state["admin_page"] = page + 1
+            st.session_state["admin_cursor"] = next_page
             st.rerun()
 
    
-    st.markdown(f"Page {page} of {total_pages}")
+    st.markdown(f"Page {page} of ~{total_pages}")
 
 
 
 
 
 
-def subject_grade_input(semester, department_code):
-    subjects = fetch_subjects(semester, department_code)
-    total_credits = 0
-    total_points = 0
+def subject_grade_input(semester, subjects):
+    grades = []
 
     st.markdown(f"### Semester {semester}")
 
     for subject in subjects:
         code = subject["code"]
         name = subject["name"]
-        credit = subject["credit"]
 
         st.markdown(f"#### {code} - {name}")
 
@@ -153,41 +193,37 @@ def subject_grade_input(semester, department_code):
                 key=f"{code}_grade"
             )
 
-        if status == "PASS" and grade:
-            gp = GRADE_POINT_MAP.get(grade, 0)
-            total_credits += credit
-            total_points += gp * credit
+        grades.append({"code": code, "status": status, "grade": grade})
 
     if st.button("Calculate CGPA"):
-        if total_credits > 0:
-            cgpa = total_points / total_credits
-            st.success(f"🎓 Your CGPA for Semester {semester} is **{round(cgpa, 2)}**")
-
-            response = requests.post(f"{BACKEND_URL}/save-result/", json={
+        if any(g["status"] == "PASS" for g in grades):
+            # The backend looks up credits and computes the GPA before saving.
+            response = api.save_result({
                 "email": st.session_state.get("user_email"),
-                "cgpa": round(cgpa, 2),
                 "semester": semester,
                 "department": st.session_state.get("department_id"),
-                "total_credits":total_credits,
-                "total_grade_points": total_points
+                "subjects": grades,
             })
 
             if response.status_code == 201:
+                cgpa = response.json().get("cgpa")
+                st.success(f"🎓 Your CGPA for Semester {semester} is **{cgpa}**")
                 st.info("Your GPA has been saved")
             else:
                 st.error("Your GPA not saved")
         else:
             st.warning("No valid grades to calculate CGPA.")
 
-def main():
+def render_app(fetches):
 
     st.title("CGPA Calculator 🎓")
 
-    
+    # Independent lookups start together; the department-specific ones
+    # start below as soon as a department is chosen.
+    fetches.start("departments", api.fetch_departments)
+    fetches.start("semesters", api.fetch_semesters)
     try:
-        response = requests.get(f"{BACKEND_URL}/departments/")
-        response.raise_for_status()
-        departments = response.json().get("departments", [])
+        departments = fetches.get("departments", api.fetch_departments)
     except Exception as e:
         st.error(f"Error fetching departments: {e}")
         st.stop()
@@ -202,25 +238,33 @@ def main():
             st.session_state["department_code"] = selected_dept_obj["code"]
             st.session_state["department_id"] = selected_dept_obj["id"]
             print("Dep_code --------------------", selected_dept_obj["code"])
+            fetches.start("curriculum", api.fetch_curriculum, selected_dept_obj["code"])
+            # Not on a delete rerun: a load racing the delete could put the
+            # old history back into the cache after it is invalidated.
+            if (st.session_state.get("view_logs") and st.session_state.get("user_email")
+                    and not st.session_state.get("delete_target")):
+                fetches.start("history", api.fetch_history, st.session_state["user_email"], selected_dept_obj["id"])
 
         email = st.text_input("Enter your email to continue:")
 
         if email and is_valid_email(email):
             if st.button("Send OTP"):
-                resp = send_otp(email)
+                resp = api.send_otp(email)
                 if "message" in resp:
                     st.success("OTP sent to your email.")
+                elif "detail" in resp:
+                    st.warning(resp["detail"])
 
             otp_input = st.text_input("Enter the OTP sent to your email")
 
             if st.button("Verify OTP"):
-                verify_result = verify_otp(email, otp_input)
+                verify_result = api.verify_otp(email, otp_input)
                 if verify_result.get("verified"):
                     st.success("Email verified")
                     st.session_state["user_email"] = email
                     st.session_state["email_verified"] = True
                 else:
-                    st.error("OTP verification failed. " + verify_result.get("error", ""))
+                    st.error("OTP verification failed. " + verify_result.get("error", verify_result.get("detail", "")))
 
             if st.session_state.get("email_verified") and st.session_state.get("department_code"):
                 if st.button("Show All Logs (Admin Only)"):
@@ -238,7 +282,7 @@ def main():
                     email = st.session_state.get("user_email")
                     dept_id = st.session_state.get("department_id")
                     try:
-                        res = requests.get(f"{BACKEND_URL}/calculate-cgpa/", params={"email": email,"dept_id":dept_id})
+                        res = api.calculate_overall_cgpa(email, dept_id)
 
                         if res.status_code == 200:
                             data = res.json()
@@ -256,10 +300,7 @@ def main():
                     # st.write("Deleting record for:", delete_target) 
                     # print("Deleting record for:", delete_target) 
                     try:
-                        delete_res = requests.delete(
-                            f"{BACKEND_URL}/delete-result/",
-                            params=delete_target
-                        )
+                        delete_res = api.delete_result(delete_target)
                         if delete_res.status_code == 200:
                             st.success(f"Deleted Semester {delete_target['semester']} result.")
                         else:
@@ -279,13 +320,9 @@ def main():
                     email = st.session_state.get("user_email")
                     dept_id = st.session_state.get("department_id")
 
-                    res = requests.get(f"{BACKEND_URL}/user-history/", params={
-                        "email": email,
-                        "dept_id": dept_id
-                    })
+                    history = fetches.get("history", api.fetch_history, email, dept_id)
 
-                    if res.status_code == 200:
-                        history = res.json().get("history", [])
+                    if history is not None:
                         if history:
                             st.markdown("### Your CGPA History (with Delete Option):")
                             for item in history:
@@ -311,13 +348,25 @@ def main():
 
 
                 
-                semesters = fetch_semesters()
+                semesters = fetches.get("semesters", api.fetch_semesters)
                 semester = st.selectbox("Select your Semester", semesters)
                 if semester:
-                    subject_grade_input(semester, st.session_state["department_code"])
+                    curriculum = fetches.get("curriculum", api.fetch_curriculum, st.session_state["department_code"])
+                    subject_grade_input(semester, api.semester_subjects(curriculum, semester))
                     
         elif email:
             st.error("Invalid email format")
 
+
+def main():
+    fetches = api.RerunFetches()
+    try:
+        render_app(fetches)
+    finally:
+        fetches.log()
+        if SHOW_LOAD_TIMINGS:
+            st.sidebar.caption(fetches.summary())
+
+
 if __name__ == '__main__':
     main()